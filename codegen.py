@@ -1,12 +1,23 @@
 from __future__ import annotations
 
 import hashlib
+import itertools
 import json
+import os
 import re
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable
 from xml.etree import ElementTree as ET
+from xml.parsers import expat
+
+try:
+    import orjson
+except ImportError:  # optional accelerator; fall back to the stdlib encoder
+    orjson = None
 
 from parser import (
     AddToListStmt,
@@ -75,6 +86,200 @@ DEFAULT_SPRITE_SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="96" heigh
     "utf-8"
 )
 DEFAULT_SVG_TARGET_SIZE = 64.0
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Byte-level view of an SVG document: an optional prolog of whitespace, XML
+# declaration or comments, then a non-empty root <svg> start tag.
+_SVG_ROOT_PATTERN = re.compile(
+    rb"(?:\s|<\?.*?\?>|<!--.*?-->)*(?P<tag><svg(?P<attrs>(?:\s[^>]*?)?)\s*>)",
+    re.S,
+)
+_SVG_ATTR_PATTERN = re.compile(rb'\s+([A-Za-z_:][\w:.-]*)\s*=\s*"([^"<&]*)"')
+_SVG_ATTRS_PATTERN = re.compile(rb'(?:\s+[A-Za-z_:][\w:.-]*\s*=\s*"[^"<&]*")*\s*')
+_SVG_SIZE_ATTR_PATTERN = re.compile(rb'\s+(?:width|height|viewBox)\s*=\s*"[^"]*"')
+_SVG_LENGTH_PATTERN = re.compile(r"^\s*([+-]?(?:\d+(?:\.\d*)?|\.\d+))")
+
+# Statements that lower to a single block with one expression input:
+# (opcode, input name, statement attribute, default shadow kind).
+_SINGLE_INPUT_STMTS: dict[type, tuple[str, str, str, str]] = {
+    MoveStmt: ("motion_movesteps", "STEPS", "steps", "number"),
+    SayStmt: ("looks_say", "MESSAGE", "message", "string"),
+    ThinkStmt: ("looks_think", "MESSAGE", "message", "string"),
+    TurnRightStmt: ("motion_turnright", "DEGREES", "degrees", "number"),
+    TurnLeftStmt: ("motion_turnleft", "DEGREES", "degrees", "number"),
+    ChangeXByStmt: ("motion_changexby", "DX", "value", "number"),
+    SetXStmt: ("motion_setx", "X", "value", "number"),
+    ChangeYByStmt: ("motion_changeyby", "DY", "value", "number"),
+    SetYStmt: ("motion_sety", "Y", "value", "number"),
+    PointInDirectionStmt: ("motion_pointindirection", "DIRECTION", "direction", "number"),
+    ChangeSizeByStmt: ("looks_changesizeby", "CHANGE", "value", "number"),
+    SetSizeToStmt: ("looks_setsizeto", "SIZE", "value", "number"),
+    WaitStmt: ("control_wait", "DURATION", "duration", "number"),
+    AskStmt: ("sensing_askandwait", "QUESTION", "question", "string"),
+}
+
+# C-block statements whose bodies are emitted as substacks of the container:
+# (statement attribute, input name) in emission order.
+_SUBSTACK_INPUTS: dict[type, tuple[tuple[str, str], ...]] = {
+    RepeatStmt: (("body", "SUBSTACK"),),
+    ForeverStmt: (("body", "SUBSTACK"),),
+    IfStmt: (("then_body", "SUBSTACK"), ("else_body", "SUBSTACK2")),
+}
+
+_NO_INPUT_STMTS: dict[type, str] = {
+    IfOnEdgeBounceStmt: "motion_ifonedgebounce",
+    ShowStmt: "looks_show",
+    HideStmt: "looks_hide",
+    NextCostumeStmt: "looks_nextcostume",
+    NextBackdropStmt: "looks_nextbackdrop",
+    ResetTimerStmt: "sensing_resettimer",
+}
+
+_BUILTIN_REPORTER_OPCODES: dict[str, str] = {
+    "answer": "sensing_answer",
+    "mouse_x": "sensing_mousex",
+    "mouse_y": "sensing_mousey",
+    "timer": "sensing_timer",
+}
+
+_BINARY_OPCODES: dict[str, str] = {
+    "+": "operator_add",
+    "-": "operator_subtract",
+    "*": "operator_multiply",
+    "/": "operator_divide",
+    "%": "operator_mod",
+    "<": "operator_lt",
+    ">": "operator_gt",
+    "=": "operator_equals",
+    "==": "operator_equals",
+    "and": "operator_and",
+    "or": "operator_or",
+}
+
+# Binary operator opcode -> (left input, right input, default shadow kind).
+_BINARY_INPUTS: dict[str, tuple[str, str, str]] = {
+    "operator_add": ("NUM1", "NUM2", "number"),
+    "operator_subtract": ("NUM1", "NUM2", "number"),
+    "operator_multiply": ("NUM1", "NUM2", "number"),
+    "operator_divide": ("NUM1", "NUM2", "number"),
+    "operator_mod": ("NUM1", "NUM2", "number"),
+    "operator_lt": ("OPERAND1", "OPERAND2", "number"),
+    "operator_gt": ("OPERAND1", "OPERAND2", "number"),
+    "operator_equals": ("OPERAND1", "OPERAND2", "string"),
+    "operator_and": ("OPERAND1", "OPERAND2", "boolean"),
+    "operator_or": ("OPERAND1", "OPERAND2", "boolean"),
+}
+
+# Hat opcodes for events that carry no fields; "when_i_receive" is handled
+# separately because it needs a broadcast field.
+_FIELDLESS_EVENT_OPCODES: dict[str, str] = {
+    "when_flag_clicked": "event_whenflagclicked",
+    "when_this_sprite_clicked": "event_whenthisspriteclicked",
+}
+
+# Every Scratch block carries the same fixed keys; emitters clone these
+# templates instead of rebuilding the full dict literal for each block.
+# Blocks stay plain dicts rather than a slotted class: both json and orjson
+# serialize dicts natively, while objects would go through a per-block
+# Python default() hook that costs more than the dicts save.
+# Keys, opcodes and input names are identifier-like literals, which CPython
+# already interns at compile time, so they need no explicit sys.intern.
+_BLOCK_TEMPLATE: dict = {
+    "opcode": "",
+    "next": None,
+    "parent": None,
+    "inputs": None,
+    "fields": None,
+    "shadow": False,
+    "topLevel": False,
+}
+_TOP_LEVEL_BLOCK_TEMPLATE: dict = {**_BLOCK_TEMPLATE, "topLevel": True, "x": 0, "y": 0}
+# sb3 only requires "opcode"; blocks that can never gain inputs or fields
+# leave both keys out rather than carrying two empty dicts.
+_BARE_BLOCK_TEMPLATE: dict = {key: value for key, value in _BLOCK_TEMPLATE.items() if key not in ("inputs", "fields")}
+# Procedure definitions always emit the same opcodes and flags, so their
+# blocks start from fully specialised templates.
+_PROCEDURE_DEFINITION_TEMPLATE: dict = {**_TOP_LEVEL_BLOCK_TEMPLATE, "opcode": "procedures_definition", "x": 30}
+_PROCEDURE_PROTOTYPE_TEMPLATE: dict = {**_BLOCK_TEMPLATE, "opcode": "procedures_prototype", "shadow": True}
+_ARGUMENT_REPORTER_TEMPLATE: dict = {**_BLOCK_TEMPLATE, "opcode": "argument_reporter_string_number", "shadow": True}
+_MENU_BLOCK_TEMPLATE: dict = {**_BLOCK_TEMPLATE, "shadow": True}
+
+
+def _block(
+    opcode: str,
+    parent_id: str | None,
+    inputs: dict | None = None,
+    fields: dict | None = None,
+    shadow: bool = False,
+    mutation: dict | None = None,
+) -> dict:
+    block = _BLOCK_TEMPLATE.copy()
+    block["opcode"] = opcode
+    block["parent"] = parent_id
+    block["inputs"] = {} if inputs is None else inputs
+    block["fields"] = {} if fields is None else fields
+    if shadow:
+        block["shadow"] = True
+    if mutation is not None:
+        block["mutation"] = mutation
+    return block
+
+
+def _menu_block(opcode: str, parent_id: str, fields: dict) -> dict:
+    block = _MENU_BLOCK_TEMPLATE.copy()
+    block["opcode"] = opcode
+    block["parent"] = parent_id
+    block["inputs"] = {}
+    block["fields"] = fields
+    return block
+
+
+def _bare_block(opcode: str, parent_id: str) -> dict:
+    block = _BARE_BLOCK_TEMPLATE.copy()
+    block["opcode"] = opcode
+    block["parent"] = parent_id
+    return block
+
+
+def _top_level_block(opcode: str, x: int, y: int, inputs: dict | None = None, fields: dict | None = None) -> dict:
+    block = _TOP_LEVEL_BLOCK_TEMPLATE.copy()
+    block["opcode"] = opcode
+    block["inputs"] = {} if inputs is None else inputs
+    block["fields"] = {} if fields is None else fields
+    block["x"] = x
+    block["y"] = y
+    return block
+
+
+_ID_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+# Zero-padded base-36 digit pairs, and the same values without padding for
+# ids below 36 ** 2 so that most ids are a single table lookup.
+_ID_PAIRS = tuple(high + low for high in _ID_DIGITS for low in _ID_DIGITS)
+_ID_SMALL = tuple(pair.lstrip("0") or "0" for pair in _ID_PAIRS)
+
+
+def _base36(value: int) -> str:
+    if value < 1296:
+        return _ID_SMALL[value]
+    high, low = divmod(value, 1296)
+    return _base36(high) + _ID_PAIRS[low]
+
+
+@lru_cache(maxsize=256)
+def _format_number(value: float) -> str:
+    # SVG sizes and transforms repeat across costumes (the target size, common
+    # viewBox extents), so formatted values are cached.
+    if float(value).is_integer():
+        return str(int(value))
+    return f"{value:.6f}".rstrip("0").rstrip(".")
+
+
+def _read_costume_source(file_path: Path) -> tuple[bytes, str] | None:
+    try:
+        data = file_path.read_bytes()
+    except OSError:
+        return None
+    return data, hashlib.md5(data).hexdigest()
 
 
 def generate_project_json(project: Project, source_dir: Path, scale_svgs: bool = True) -> tuple[dict, dict[str, bytes]]:
@@ -84,18 +289,49 @@ def generate_project_json(project: Project, source_dir: Path, scale_svgs: bool =
 
 def write_sb3(project_json: dict, assets: dict[str, bytes], output_path: Path) -> None:
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr("project.json", json.dumps(project_json, indent=2))
-        for asset_name, asset_bytes in assets.items():
-            zf.writestr(asset_name, asset_bytes)
-
-
-@dataclass
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # project.json is serialized on a worker while the assets are
+        # deflated and written here; zlib and file writes release the GIL, so
+        # the two overlap. Entry order inside the archive does not matter.
+        project_bytes = executor.submit(_serialize_project_json, project_json)
+        with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            for asset_name, asset_bytes in assets.items():
+                if asset_bytes.startswith(_PNG_SIGNATURE):
+                    # PNG data is already deflated; storing it avoids a second pointless pass.
+                    zf.writestr(asset_name, asset_bytes, compress_type=zipfile.ZIP_STORED)
+                else:
+                    zf.writestr(asset_name, asset_bytes)
+            zf.writestr("project.json", project_bytes.result())
+
+
+def _serialize_project_json(project_json: dict) -> bytes | str:
+    if orjson is not None:
+        return orjson.dumps(project_json)
+    # json.dumps runs the C encoder in one shot; json.dump to a stream falls
+    # back to the pure-Python iterencode path.
+    return json.dumps(project_json, separators=(",", ":"))
+
+
+@dataclass(slots=True)
 class _ProcedureSignature:
     name: str
     params: list[str]
     arg_ids: list[str]
     proccode: str
+    arg_ids_json: str
+    params_json: str
+    defaults_json: str
+
+
+@dataclass(slots=True)
+class _ChainFrame:
+    statements: list[Statement]
+    parent_id: str
+    owner: dict | None = None
+    input_name: str | None = None
+    index: int = 0
+    first: str | None = None
+    last: str | None = None
 
 
 class _ProjectBuilder:
@@ -103,22 +339,33 @@ class _ProjectBuilder:
         self.project = project
         self.source_dir = source_dir
         self.scale_svgs = scale_svgs
-        self._id_counter = 0
+        # Block ids are a per-build counter rendered in base 36; they only
+        # need to be unique within one project.json.
+        self._block_ids = map(_base36, itertools.count(1))
         self.assets: dict[str, bytes] = {}
         self.broadcast_ids: dict[str, str] = {}
+        self._stage_broadcasts: dict[str, str] = {}
+        self._costume_keys: dict[Path | str, tuple[str, str]] = {}
+        self._costume_assets: dict[tuple[str, str], tuple[str, bytes, float, float]] = {}
+        self._number_literals: dict[float, str] = {}
+        self._costume_sources: dict[Path, tuple[bytes, str]] = {}
+        self._resolved_costume_paths: dict[str, Path] = {}
 
     def build(self) -> tuple[dict, dict[str, bytes]]:
         self.broadcast_ids = self._collect_broadcast_ids()
-        ordered_targets = sorted(self.project.targets, key=lambda t: 0 if t.is_stage else 1)
-        if not any(target.is_stage for target in ordered_targets):
-            ordered_targets = [self._synthesized_stage_target(ordered_targets)] + ordered_targets
+        self._load_costume_sources()
+        self._stage_broadcasts = {broadcast_id: message for message, broadcast_id in self.broadcast_ids.items()}
+        stages: list[Target] = []
+        sprites: list[Target] = []
+        for target in self.project.targets:
+            (stages if target.is_stage else sprites).append(target)
+        if not stages:
+            stages.append(self._synthesized_stage_target(sprites))
         targets_json: list[dict] = []
-        sprite_layer = 1
-        for target in ordered_targets:
-            layer = 0 if target.is_stage else sprite_layer
-            if not target.is_stage:
-                sprite_layer += 1
-            targets_json.append(self._build_target_json(target=target, layer_order=layer))
+        for target in stages:
+            targets_json.append(self._build_target_json(target=target, layer_order=0))
+        for sprite_layer, target in enumerate(sprites, start=1):
+            targets_json.append(self._build_target_json(target=target, layer_order=sprite_layer))
         project_json = {
             "targets": targets_json,
             "monitors": [],
@@ -146,14 +393,21 @@ class _ProjectBuilder:
         variables_json: dict[str, list] = {}
         lists_map: dict[str, str] = {}
         lists_json: dict[str, list] = {}
+        new_id = self._new_id
         for var_decl in target.variables:
-            var_id = self._new_id("var")
+            var_id = new_id("var")
             variables_map[var_decl.name.lower()] = var_id
             variables_json[var_id] = [var_decl.name, 0]
         for list_decl in target.lists:
-            list_id = self._new_id("list")
+            list_id = new_id("list")
             lists_map[list_decl.name.lower()] = list_id
             lists_json[list_id] = [list_decl.name, []]
+        # Lookups try the name exactly as written before lowercasing it, so
+        # references that match the declaration's spelling skip str.lower().
+        for var_decl in target.variables:
+            variables_map[var_decl.name] = variables_map[var_decl.name.lower()]
+        for list_decl in target.lists:
+            lists_map[list_decl.name] = lists_map[list_decl.name.lower()]
 
         procedures = self._build_procedure_signatures(target)
         y_cursor = 30
@@ -180,7 +434,7 @@ class _ProjectBuilder:
             y_cursor += 40
 
         costumes_json = self._build_costumes(target)
-        stage_broadcasts = {broadcast_id: message for message, broadcast_id in self.broadcast_ids.items()} if target.is_stage else {}
+        stage_broadcasts = self._stage_broadcasts if target.is_stage else {}
 
         target_json = {
             "isStage": target.is_stage,
@@ -221,16 +475,23 @@ class _ProjectBuilder:
 
     def _build_procedure_signatures(self, target: Target) -> dict[str, _ProcedureSignature]:
         signatures: dict[str, _ProcedureSignature] = {}
+        new_id = self._new_id
         for procedure in target.procedures:
-            arg_ids = [self._new_id("arg") for _ in procedure.params]
+            arg_ids = [new_id("arg") for _ in procedure.params]
             placeholders = " ".join("%s" for _ in procedure.params)
             proccode = procedure.name if not placeholders else f"{procedure.name} {placeholders}"
+            arg_ids_json = json.dumps(arg_ids)
             signatures[procedure.name.lower()] = _ProcedureSignature(
                 name=procedure.name,
                 params=procedure.params,
                 arg_ids=arg_ids,
                 proccode=proccode,
+                arg_ids_json=arg_ids_json,
+                params_json=json.dumps(procedure.params),
+                defaults_json=json.dumps(["" for _ in procedure.params]),
             )
+        for procedure in target.procedures:
+            signatures[procedure.name] = signatures[procedure.name.lower()]
         return signatures
 
     def _emit_procedure_definition(
@@ -242,53 +503,40 @@ class _ProjectBuilder:
         lists_map: dict[str, str],
         start_y: int,
     ) -> int:
-        signature = signatures[procedure.name.lower()]
+        signature = signatures[procedure.name]
         definition_id = self._new_block_id()
         prototype_id = self._new_block_id()
-        blocks[definition_id] = {
-            "opcode": "procedures_definition",
-            "next": None,
-            "parent": None,
-            "inputs": {"custom_block": [1, prototype_id]},
-            "fields": {},
-            "shadow": False,
-            "topLevel": True,
-            "x": 30,
-            "y": start_y,
-        }
+        definition = _PROCEDURE_DEFINITION_TEMPLATE.copy()
+        definition["inputs"] = {"custom_block": [1, prototype_id]}
+        definition["fields"] = {}
+        definition["y"] = start_y
+        blocks[definition_id] = definition
 
         prototype_inputs: dict[str, list] = {}
+        new_block_id = self._new_block_id
         for param_name, arg_id in zip(signature.params, signature.arg_ids):
-            reporter_id = self._new_block_id()
-            blocks[reporter_id] = {
-                "opcode": "argument_reporter_string_number",
-                "next": None,
-                "parent": prototype_id,
-                "inputs": {},
-                "fields": {"VALUE": [param_name, None]},
-                "shadow": True,
-                "topLevel": False,
-            }
+            reporter_id = new_block_id()
+            reporter = _ARGUMENT_REPORTER_TEMPLATE.copy()
+            reporter["parent"] = prototype_id
+            reporter["inputs"] = {}
+            reporter["fields"] = {"VALUE": [param_name, None]}
+            blocks[reporter_id] = reporter
             prototype_inputs[arg_id] = [1, reporter_id]
 
-        blocks[prototype_id] = {
-            "opcode": "procedures_prototype",
-            "next": None,
-            "parent": definition_id,
-            "inputs": prototype_inputs,
-            "fields": {},
-            "shadow": True,
-            "topLevel": False,
-            "mutation": {
-                "tagName": "mutation",
-                "children": [],
-                "proccode": signature.proccode,
-                "argumentids": json.dumps(signature.arg_ids),
-                "argumentnames": json.dumps(signature.params),
-                "argumentdefaults": json.dumps(["" for _ in signature.params]),
-                "warp": "false",
-            },
+        prototype = _PROCEDURE_PROTOTYPE_TEMPLATE.copy()
+        prototype["parent"] = definition_id
+        prototype["inputs"] = prototype_inputs
+        prototype["fields"] = {}
+        prototype["mutation"] = {
+            "tagName": "mutation",
+            "children": [],
+            "proccode": signature.proccode,
+            "argumentids": signature.arg_ids_json,
+            "argumentnames": signature.params_json,
+            "argumentdefaults": signature.defaults_json,
+            "warp": "false",
         }
+        blocks[prototype_id] = prototype
 
         first_stmt, last_stmt = self._emit_statement_chain(
             blocks=blocks,
@@ -297,7 +545,9 @@ class _ProjectBuilder:
             variables_map=variables_map,
             lists_map=lists_map,
             signatures=signatures,
-            param_scope=set(signature.params),
+            # Parameter names are matched case-insensitively, so the scope
+            # holds them lowercased once rather than per reference.
+            param_scope={name.lower() for name in signature.params},
         )
         if first_stmt:
             blocks[definition_id]["next"] = first_stmt
@@ -313,11 +563,8 @@ class _ProjectBuilder:
         lists_map: dict[str, str],
         start_y: int,
     ) -> int:
-        if script.event_type == "when_flag_clicked":
-            opcode = "event_whenflagclicked"
-            fields = {}
-        elif script.event_type == "when_this_sprite_clicked":
-            opcode = "event_whenthisspriteclicked"
+        opcode = _FIELDLESS_EVENT_OPCODES.get(script.event_type)
+        if opcode is not None:
             fields = {}
         elif script.event_type == "when_i_receive":
             opcode = "event_whenbroadcastreceived"
@@ -329,17 +576,7 @@ class _ProjectBuilder:
             raise CodegenError(f"Unsupported event type '{script.event_type}'.")
 
         hat_id = self._new_block_id()
-        blocks[hat_id] = {
-            "opcode": opcode,
-            "next": None,
-            "parent": None,
-            "inputs": {},
-            "fields": fields,
-            "shadow": False,
-            "topLevel": True,
-            "x": 320,
-            "y": start_y,
-        }
+        blocks[hat_id] = _top_level_block(opcode, x=320, y=start_y, fields=fields)
 
         first_stmt, last_stmt = self._emit_statement_chain(
             blocks=blocks,
@@ -365,128 +602,73 @@ class _ProjectBuilder:
         signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> tuple[str | None, str | None]:
-        first: str | None = None
-        prev: str | None = None
-        for stmt in statements:
-            stmt_parent = parent_id if prev is None else prev
-            stmt_id = self._emit_statement(
-                blocks=blocks,
-                stmt=stmt,
-                parent_id=stmt_parent,
-                variables_map=variables_map,
-                lists_map=lists_map,
-                signatures=signatures,
-                param_scope=param_scope,
+        # Nested bodies are emitted from an explicit stack of pending chains
+        # rather than by recursing through the container emitters.
+        emitters = _STATEMENT_EMITTERS
+        root = _ChainFrame(statements=statements, parent_id=parent_id)
+        stack = [root]
+        while stack:
+            frame = stack[-1]
+            if frame.index == len(frame.statements):
+                stack.pop()
+                if frame.owner is not None and frame.first is not None:
+                    frame.owner["inputs"][frame.input_name] = [2, frame.first]
+                continue
+            stmt = frame.statements[frame.index]
+            frame.index += 1
+            prev = frame.last
+            stmt_type = type(stmt)
+            emitter = emitters.get(stmt_type)
+            if emitter is None:
+                raise CodegenError(f"Unsupported statement type '{stmt_type.__name__}'.")
+            stmt_id = emitter(
+                self,
+                blocks,
+                stmt,
+                frame.parent_id if prev is None else prev,
+                variables_map,
+                lists_map,
+                signatures,
+                param_scope,
             )
-            if prev is not None:
+            if prev is None:
+                frame.first = stmt_id
+            else:
                 blocks[prev]["next"] = stmt_id
-            if first is None:
-                first = stmt_id
-            prev = stmt_id
-        return first, prev
+            frame.last = stmt_id
+            substacks = _SUBSTACK_INPUTS.get(stmt_type)
+            if substacks is not None:
+                owner = blocks[stmt_id]
+                for attr, input_name in reversed(substacks):
+                    stack.append(
+                        _ChainFrame(
+                            statements=getattr(stmt, attr),
+                            parent_id=stmt_id,
+                            owner=owner,
+                            input_name=input_name,
+                        )
+                    )
+        return root.first, root.last
 
-    def _emit_statement(
+    def _emit_broadcast_stmt(
         self,
         blocks: dict[str, dict],
-        stmt: Statement,
+        stmt: BroadcastStmt,
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
         signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
-        if isinstance(stmt, BroadcastStmt):
-            return self._emit_broadcast_stmt(blocks, stmt, parent_id)
-        if isinstance(stmt, SetVarStmt):
-            return self._emit_set_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, ChangeVarStmt):
-            return self._emit_change_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, MoveStmt):
-            return self._emit_move_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, SayStmt):
-            return self._emit_say_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, ThinkStmt):
-            return self._emit_think_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, TurnRightStmt):
-            return self._emit_turn_stmt(blocks, "motion_turnright", stmt.degrees, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, TurnLeftStmt):
-            return self._emit_turn_stmt(blocks, "motion_turnleft", stmt.degrees, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, GoToXYStmt):
-            return self._emit_go_to_xy_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, ChangeXByStmt):
-            return self._emit_single_input_stmt(blocks, "motion_changexby", "DX", stmt.value, parent_id, variables_map, lists_map, param_scope, "number")
-        if isinstance(stmt, SetXStmt):
-            return self._emit_single_input_stmt(blocks, "motion_setx", "X", stmt.value, parent_id, variables_map, lists_map, param_scope, "number")
-        if isinstance(stmt, ChangeYByStmt):
-            return self._emit_single_input_stmt(blocks, "motion_changeyby", "DY", stmt.value, parent_id, variables_map, lists_map, param_scope, "number")
-        if isinstance(stmt, SetYStmt):
-            return self._emit_single_input_stmt(blocks, "motion_sety", "Y", stmt.value, parent_id, variables_map, lists_map, param_scope, "number")
-        if isinstance(stmt, PointInDirectionStmt):
-            return self._emit_single_input_stmt(blocks, "motion_pointindirection", "DIRECTION", stmt.direction, parent_id, variables_map, lists_map, param_scope, "number")
-        if isinstance(stmt, IfOnEdgeBounceStmt):
-            return self._emit_no_input_stmt(blocks, "motion_ifonedgebounce", parent_id)
-        if isinstance(stmt, ChangeSizeByStmt):
-            return self._emit_single_input_stmt(blocks, "looks_changesizeby", "CHANGE", stmt.value, parent_id, variables_map, lists_map, param_scope, "number")
-        if isinstance(stmt, SetSizeToStmt):
-            return self._emit_single_input_stmt(blocks, "looks_setsizeto", "SIZE", stmt.value, parent_id, variables_map, lists_map, param_scope, "number")
-        if isinstance(stmt, ShowStmt):
-            return self._emit_no_input_stmt(blocks, "looks_show", parent_id)
-        if isinstance(stmt, HideStmt):
-            return self._emit_no_input_stmt(blocks, "looks_hide", parent_id)
-        if isinstance(stmt, NextCostumeStmt):
-            return self._emit_no_input_stmt(blocks, "looks_nextcostume", parent_id)
-        if isinstance(stmt, NextBackdropStmt):
-            return self._emit_no_input_stmt(blocks, "looks_nextbackdrop", parent_id)
-        if isinstance(stmt, WaitStmt):
-            return self._emit_single_input_stmt(blocks, "control_wait", "DURATION", stmt.duration, parent_id, variables_map, lists_map, param_scope, "number")
-        if isinstance(stmt, ForeverStmt):
-            return self._emit_forever_stmt(blocks, stmt, parent_id, variables_map, lists_map, signatures, param_scope)
-        if isinstance(stmt, StopStmt):
-            return self._emit_stop_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, AskStmt):
-            return self._emit_single_input_stmt(blocks, "sensing_askandwait", "QUESTION", stmt.question, parent_id, variables_map, lists_map, param_scope, "string")
-        if isinstance(stmt, ResetTimerStmt):
-            return self._emit_no_input_stmt(blocks, "sensing_resettimer", parent_id)
-        if isinstance(stmt, AddToListStmt):
-            return self._emit_add_to_list_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, DeleteOfListStmt):
-            return self._emit_delete_of_list_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, DeleteAllOfListStmt):
-            return self._emit_delete_all_of_list_stmt(blocks, stmt, parent_id, lists_map)
-        if isinstance(stmt, InsertAtListStmt):
-            return self._emit_insert_at_list_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, ReplaceItemOfListStmt):
-            return self._emit_replace_item_of_list_stmt(blocks, stmt, parent_id, variables_map, lists_map, param_scope)
-        if isinstance(stmt, RepeatStmt):
-            return self._emit_repeat_stmt(blocks, stmt, parent_id, variables_map, lists_map, signatures, param_scope)
-        if isinstance(stmt, IfStmt):
-            return self._emit_if_stmt(blocks, stmt, parent_id, variables_map, lists_map, signatures, param_scope)
-        if isinstance(stmt, ProcedureCallStmt):
-            return self._emit_call_stmt(blocks, stmt, parent_id, variables_map, lists_map, signatures, param_scope)
-        raise CodegenError(f"Unsupported statement type '{type(stmt).__name__}'.")
-
-    def _emit_broadcast_stmt(self, blocks: dict[str, dict], stmt: BroadcastStmt, parent_id: str) -> str:
         block_id = self._new_block_id()
         menu_id = self._new_block_id()
         broadcast_id = self._broadcast_id(stmt.message)
-        blocks[block_id] = {
-            "opcode": "event_broadcast",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {"BROADCAST_INPUT": [1, menu_id]},
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
-        blocks[menu_id] = {
-            "opcode": "event_broadcast_menu",
-            "next": None,
-            "parent": block_id,
-            "inputs": {},
-            "fields": {"BROADCAST_OPTION": [stmt.message, broadcast_id]},
-            "shadow": True,
-            "topLevel": False,
-        }
+        blocks[block_id] = _block("event_broadcast", parent_id, inputs={"BROADCAST_INPUT": [1, menu_id]})
+        blocks[menu_id] = _menu_block(
+            "event_broadcast_menu",
+            block_id,
+            {"BROADCAST_OPTION": [stmt.message, broadcast_id]},
+        )
         return block_id
 
     def _emit_set_stmt(
@@ -496,29 +678,19 @@ class _ProjectBuilder:
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
         var_id = self._lookup_var_id(variables_map, stmt.var_name)
         block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "data_setvariableto",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {
-                "VALUE": self._expr_input(
-                    blocks=blocks,
-                    expr=stmt.value,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind="number",
-                )
+        blocks[block_id] = _block(
+            "data_setvariableto",
+            parent_id,
+            inputs={
+                "VALUE": self._expr_input(blocks, stmt.value, block_id, variables_map, lists_map, param_scope, "number")
             },
-            "fields": {"VARIABLE": [stmt.var_name, var_id]},
-            "shadow": False,
-            "topLevel": False,
-        }
+            fields={"VARIABLE": [stmt.var_name, var_id]},
+        )
         return block_id
 
     def _emit_change_stmt(
@@ -528,185 +700,72 @@ class _ProjectBuilder:
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
         var_id = self._lookup_var_id(variables_map, stmt.var_name)
         block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "data_changevariableby",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {
-                "VALUE": self._expr_input(
-                    blocks=blocks,
-                    expr=stmt.delta,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind="number",
-                )
-            },
-            "fields": {"VARIABLE": [stmt.var_name, var_id]},
-            "shadow": False,
-            "topLevel": False,
-        }
-        return block_id
-
-    def _emit_move_stmt(
-        self,
-        blocks: dict[str, dict],
-        stmt: MoveStmt,
-        parent_id: str,
-        variables_map: dict[str, str],
-        lists_map: dict[str, str],
-        param_scope: set[str],
-    ) -> str:
-        block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "motion_movesteps",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {
-                "STEPS": self._expr_input(
-                    blocks=blocks,
-                    expr=stmt.steps,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind="number",
-                )
-            },
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
-        return block_id
-
-    def _emit_say_stmt(
-        self,
-        blocks: dict[str, dict],
-        stmt: SayStmt,
-        parent_id: str,
-        variables_map: dict[str, str],
-        lists_map: dict[str, str],
-        param_scope: set[str],
-    ) -> str:
-        block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "looks_say",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {
-                "MESSAGE": self._expr_input(
-                    blocks=blocks,
-                    expr=stmt.message,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind="string",
-                )
+        blocks[block_id] = _block(
+            "data_changevariableby",
+            parent_id,
+            inputs={
+                "VALUE": self._expr_input(blocks, stmt.delta, block_id, variables_map, lists_map, param_scope, "number")
             },
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
+            fields={"VARIABLE": [stmt.var_name, var_id]},
+        )
         return block_id
 
-    def _emit_think_stmt(
+    def _emit_go_to_xy_stmt(
         self,
         blocks: dict[str, dict],
-        stmt: ThinkStmt,
+        stmt: GoToXYStmt,
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
         block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "looks_think",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {
-                "MESSAGE": self._expr_input(
-                    blocks=blocks,
-                    expr=stmt.message,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind="string",
-                )
-            },
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
+        inputs: dict[str, list] = {}
+        blocks[block_id] = _block("motion_gotoxy", parent_id, inputs=inputs)
+        inputs["X"] = self._expr_input(blocks, stmt.x, block_id, variables_map, lists_map, param_scope, "number")
+        inputs["Y"] = self._expr_input(blocks, stmt.y, block_id, variables_map, lists_map, param_scope, "number")
         return block_id
 
-    def _emit_turn_stmt(
+    def _emit_mapped_single_input_stmt(
         self,
         blocks: dict[str, dict],
-        opcode: str,
-        value: Expr,
+        stmt: Statement,
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
-        input_name = "DEGREES"
+        opcode, input_name, attr, default_kind = _SINGLE_INPUT_STMTS[type(stmt)]
         return self._emit_single_input_stmt(
             blocks,
             opcode,
             input_name,
-            value,
+            getattr(stmt, attr),
             parent_id,
             variables_map,
             lists_map,
             param_scope,
-            "number",
+            default_kind,
         )
 
-    def _emit_go_to_xy_stmt(
+    def _emit_mapped_no_input_stmt(
         self,
         blocks: dict[str, dict],
-        stmt: GoToXYStmt,
+        stmt: Statement,
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
-        block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "motion_gotoxy",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {},
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
-        blocks[block_id]["inputs"]["X"] = self._expr_input(
-            blocks=blocks,
-            expr=stmt.x,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            param_scope=param_scope,
-            default_kind="number",
-        )
-        blocks[block_id]["inputs"]["Y"] = self._expr_input(
-            blocks=blocks,
-            expr=stmt.y,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            param_scope=param_scope,
-            default_kind="number",
-        )
-        return block_id
+        return self._emit_no_input_stmt(blocks, _NO_INPUT_STMTS[type(stmt)], parent_id)
 
     def _emit_single_input_stmt(
         self,
@@ -721,38 +780,18 @@ class _ProjectBuilder:
         default_kind: str,
     ) -> str:
         block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": opcode,
-            "next": None,
-            "parent": parent_id,
-            "inputs": {
-                input_name: self._expr_input(
-                    blocks=blocks,
-                    expr=value,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind=default_kind,
-                )
+        blocks[block_id] = _block(
+            opcode,
+            parent_id,
+            inputs={
+                input_name: self._expr_input(blocks, value, block_id, variables_map, lists_map, param_scope, default_kind)
             },
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
+        )
         return block_id
 
     def _emit_no_input_stmt(self, blocks: dict[str, dict], opcode: str, parent_id: str) -> str:
         block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": opcode,
-            "next": None,
-            "parent": parent_id,
-            "inputs": {},
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
+        blocks[block_id] = _bare_block(opcode, parent_id)
         return block_id
 
     def _emit_repeat_stmt(
@@ -766,37 +805,13 @@ class _ProjectBuilder:
         param_scope: set[str],
     ) -> str:
         block_id = self._new_block_id()
-        block = {
-            "opcode": "control_repeat",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {
-                "TIMES": self._expr_input(
-                    blocks=blocks,
-                    expr=stmt.times,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind="number",
-                )
+        blocks[block_id] = _block(
+            "control_repeat",
+            parent_id,
+            inputs={
+                "TIMES": self._expr_input(blocks, stmt.times, block_id, variables_map, lists_map, param_scope, "number")
             },
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
-        blocks[block_id] = block
-        sub_first, _ = self._emit_statement_chain(
-            blocks=blocks,
-            statements=stmt.body,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            signatures=signatures,
-            param_scope=param_scope,
         )
-        if sub_first is not None:
-            block["inputs"]["SUBSTACK"] = [2, sub_first]
         return block_id
 
     def _emit_forever_stmt(
@@ -810,27 +825,7 @@ class _ProjectBuilder:
         param_scope: set[str],
     ) -> str:
         block_id = self._new_block_id()
-        block = {
-            "opcode": "control_forever",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {},
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
-        blocks[block_id] = block
-        sub_first, _ = self._emit_statement_chain(
-            blocks=blocks,
-            statements=stmt.body,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            signatures=signatures,
-            param_scope=param_scope,
-        )
-        if sub_first is not None:
-            block["inputs"]["SUBSTACK"] = [2, sub_first]
+        blocks[block_id] = _block("control_forever", parent_id)
         return block_id
 
     def _emit_stop_stmt(
@@ -840,6 +835,7 @@ class _ProjectBuilder:
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
         block_id = self._new_block_id()
@@ -847,16 +843,12 @@ class _ProjectBuilder:
         stop_option = "all"
         if option_literal is not None and option_literal[0] == 10:
             stop_option = str(option_literal[1])
-        blocks[block_id] = {
-            "opcode": "control_stop",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {},
-            "fields": {"STOP_OPTION": [stop_option, None]},
-            "shadow": False,
-            "topLevel": False,
-            "mutation": {"tagName": "mutation", "children": [], "hasnext": "false"},
-        }
+        blocks[block_id] = _block(
+            "control_stop",
+            parent_id,
+            fields={"STOP_OPTION": [stop_option, None]},
+            mutation={"tagName": "mutation", "children": [], "hasnext": "false"},
+        )
         return block_id
 
     def _emit_add_to_list_stmt(
@@ -866,29 +858,19 @@ class _ProjectBuilder:
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
         list_id = self._lookup_list_id(lists_map, stmt.list_name)
         block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "data_addtolist",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {
-                "ITEM": self._expr_input(
-                    blocks=blocks,
-                    expr=stmt.item,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind="string",
-                )
+        blocks[block_id] = _block(
+            "data_addtolist",
+            parent_id,
+            inputs={
+                "ITEM": self._expr_input(blocks, stmt.item, block_id, variables_map, lists_map, param_scope, "string")
             },
-            "fields": {"LIST": [stmt.list_name, list_id]},
-            "shadow": False,
-            "topLevel": False,
-        }
+            fields={"LIST": [stmt.list_name, list_id]},
+        )
         return block_id
 
     def _emit_delete_of_list_stmt(
@@ -898,29 +880,19 @@ class _ProjectBuilder:
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
         list_id = self._lookup_list_id(lists_map, stmt.list_name)
         block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "data_deleteoflist",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {
-                "INDEX": self._expr_input(
-                    blocks=blocks,
-                    expr=stmt.index,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind="number",
-                )
+        blocks[block_id] = _block(
+            "data_deleteoflist",
+            parent_id,
+            inputs={
+                "INDEX": self._expr_input(blocks, stmt.index, block_id, variables_map, lists_map, param_scope, "number")
             },
-            "fields": {"LIST": [stmt.list_name, list_id]},
-            "shadow": False,
-            "topLevel": False,
-        }
+            fields={"LIST": [stmt.list_name, list_id]},
+        )
         return block_id
 
     def _emit_delete_all_of_list_stmt(
@@ -928,19 +900,14 @@ class _ProjectBuilder:
         blocks: dict[str, dict],
         stmt: DeleteAllOfListStmt,
         parent_id: str,
+        variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
+        param_scope: set[str],
     ) -> str:
         list_id = self._lookup_list_id(lists_map, stmt.list_name)
         block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "data_deletealloflist",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {},
-            "fields": {"LIST": [stmt.list_name, list_id]},
-            "shadow": False,
-            "topLevel": False,
-        }
+        blocks[block_id] = _block("data_deletealloflist", parent_id, fields={"LIST": [stmt.list_name, list_id]})
         return block_id
 
     def _emit_insert_at_list_stmt(
@@ -950,37 +917,15 @@ class _ProjectBuilder:
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
         list_id = self._lookup_list_id(lists_map, stmt.list_name)
         block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "data_insertatlist",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {},
-            "fields": {"LIST": [stmt.list_name, list_id]},
-            "shadow": False,
-            "topLevel": False,
-        }
-        blocks[block_id]["inputs"]["ITEM"] = self._expr_input(
-            blocks=blocks,
-            expr=stmt.item,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            param_scope=param_scope,
-            default_kind="string",
-        )
-        blocks[block_id]["inputs"]["INDEX"] = self._expr_input(
-            blocks=blocks,
-            expr=stmt.index,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            param_scope=param_scope,
-            default_kind="number",
-        )
+        inputs: dict[str, list] = {}
+        blocks[block_id] = _block("data_insertatlist", parent_id, inputs=inputs, fields={"LIST": [stmt.list_name, list_id]})
+        inputs["ITEM"] = self._expr_input(blocks, stmt.item, block_id, variables_map, lists_map, param_scope, "string")
+        inputs["INDEX"] = self._expr_input(blocks, stmt.index, block_id, variables_map, lists_map, param_scope, "number")
         return block_id
 
     def _emit_replace_item_of_list_stmt(
@@ -990,37 +935,15 @@ class _ProjectBuilder:
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
+        signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
         list_id = self._lookup_list_id(lists_map, stmt.list_name)
         block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": "data_replaceitemoflist",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {},
-            "fields": {"LIST": [stmt.list_name, list_id]},
-            "shadow": False,
-            "topLevel": False,
-        }
-        blocks[block_id]["inputs"]["INDEX"] = self._expr_input(
-            blocks=blocks,
-            expr=stmt.index,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            param_scope=param_scope,
-            default_kind="number",
-        )
-        blocks[block_id]["inputs"]["ITEM"] = self._expr_input(
-            blocks=blocks,
-            expr=stmt.item,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            param_scope=param_scope,
-            default_kind="string",
-        )
+        inputs: dict[str, list] = {}
+        blocks[block_id] = _block("data_replaceitemoflist", parent_id, inputs=inputs, fields={"LIST": [stmt.list_name, list_id]})
+        inputs["INDEX"] = self._expr_input(blocks, stmt.index, block_id, variables_map, lists_map, param_scope, "number")
+        inputs["ITEM"] = self._expr_input(blocks, stmt.item, block_id, variables_map, lists_map, param_scope, "string")
         return block_id
 
     def _emit_if_stmt(
@@ -1034,48 +957,13 @@ class _ProjectBuilder:
         param_scope: set[str],
     ) -> str:
         block_id = self._new_block_id()
-        block = {
-            "opcode": "control_if_else",
-            "next": None,
-            "parent": parent_id,
-            "inputs": {
-                "CONDITION": self._expr_input(
-                    blocks=blocks,
-                    expr=stmt.condition,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind="boolean",
-                )
+        blocks[block_id] = _block(
+            "control_if_else",
+            parent_id,
+            inputs={
+                "CONDITION": self._expr_input(blocks, stmt.condition, block_id, variables_map, lists_map, param_scope, "boolean")
             },
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
-        blocks[block_id] = block
-        then_first, _ = self._emit_statement_chain(
-            blocks=blocks,
-            statements=stmt.then_body,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            signatures=signatures,
-            param_scope=param_scope,
-        )
-        else_first, _ = self._emit_statement_chain(
-            blocks=blocks,
-            statements=stmt.else_body,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            signatures=signatures,
-            param_scope=param_scope,
         )
-        if then_first is not None:
-            block["inputs"]["SUBSTACK"] = [2, then_first]
-        if else_first is not None:
-            block["inputs"]["SUBSTACK2"] = [2, else_first]
         return block_id
 
     def _emit_call_stmt(
@@ -1088,37 +976,28 @@ class _ProjectBuilder:
         signatures: dict[str, _ProcedureSignature],
         param_scope: set[str],
     ) -> str:
-        signature = signatures.get(stmt.name.lower())
+        signature = signatures.get(stmt.name)
+        if signature is None:
+            signature = signatures.get(stmt.name.lower())
         if signature is None:
             raise CodegenError(f"Unknown procedure '{stmt.name}' during code generation.")
         block_id = self._new_block_id()
         inputs: dict[str, list] = {}
+        expr_input = self._expr_input
         for arg_id, arg_expr in zip(signature.arg_ids, stmt.args):
-            inputs[arg_id] = self._expr_input(
-                blocks=blocks,
-                expr=arg_expr,
-                parent_id=block_id,
-                variables_map=variables_map,
-                lists_map=lists_map,
-                param_scope=param_scope,
-                default_kind="string",
-            )
-        blocks[block_id] = {
-            "opcode": "procedures_call",
-            "next": None,
-            "parent": parent_id,
-            "inputs": inputs,
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-            "mutation": {
+            inputs[arg_id] = expr_input(blocks, arg_expr, block_id, variables_map, lists_map, param_scope, "string")
+        blocks[block_id] = _block(
+            "procedures_call",
+            parent_id,
+            inputs=inputs,
+            mutation={
                 "tagName": "mutation",
                 "children": [],
                 "proccode": signature.proccode,
-                "argumentids": json.dumps(signature.arg_ids),
+                "argumentids": signature.arg_ids_json,
                 "warp": "false",
             },
-        }
+        )
         return block_id
 
     def _expr_input(
@@ -1131,242 +1010,172 @@ class _ProjectBuilder:
         param_scope: set[str],
         default_kind: str,
     ) -> list:
-        literal = self._literal_input(expr)
-        if literal is not None:
-            return [1, literal]
-        reporter_id = self._emit_expr_reporter(
-            blocks=blocks,
-            expr=expr,
-            parent_id=parent_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            param_scope=param_scope,
-        )
+        expr_type = type(expr)
+        if expr_type is StringExpr:
+            return [1, [10, expr.value]]
+        if expr_type is NumberExpr:
+            # Identical numbers share their formatted text; the input lists
+            # stay per block, since callers may edit the returned project.
+            value = expr.value
+            text = self._number_literals.get(value)
+            if text is None:
+                text = str(int(value) if value.is_integer() else value)
+                self._number_literals[value] = text
+            return [1, [4, text]]
+        emitter = _EXPR_EMITTERS.get(expr_type)
+        if emitter is None:
+            raise CodegenError(f"Unsupported expression type '{expr_type.__name__}'.")
+        reporter_id = emitter(self, blocks, expr, parent_id, variables_map, lists_map, param_scope)
         if reporter_id is None:
             return [1, self._default_shadow(default_kind)]
         return [2, reporter_id]
 
-    def _emit_expr_reporter(
+    def _emit_builtin_reporter(
         self,
         blocks: dict[str, dict],
-        expr: Expr,
+        expr: BuiltinReporterExpr,
         parent_id: str,
         variables_map: dict[str, str],
         lists_map: dict[str, str],
         param_scope: set[str],
-    ) -> str | None:
-        if isinstance(expr, NumberExpr) or isinstance(expr, StringExpr):
-            return None
-        if isinstance(expr, BuiltinReporterExpr):
-            opcode_map = {
-                "answer": "sensing_answer",
-                "mouse_x": "sensing_mousex",
-                "mouse_y": "sensing_mousey",
-                "timer": "sensing_timer",
-            }
-            opcode = opcode_map.get(expr.kind)
-            if opcode is None:
-                raise CodegenError(f"Unsupported built-in reporter '{expr.kind}'.")
-            block_id = self._new_block_id()
-            blocks[block_id] = {
-                "opcode": opcode,
-                "next": None,
-                "parent": parent_id,
-                "inputs": {},
-                "fields": {},
-                "shadow": False,
-                "topLevel": False,
-            }
-            return block_id
-        if isinstance(expr, VarExpr):
-            param_lookup = {name.lower() for name in param_scope}
-            lowered = expr.name.lower()
-            if lowered in param_lookup:
-                block_id = self._new_block_id()
-                blocks[block_id] = {
-                    "opcode": "argument_reporter_string_number",
-                    "next": None,
-                    "parent": parent_id,
-                    "inputs": {},
-                    "fields": {"VALUE": [expr.name, None]},
-                    "shadow": False,
-                    "topLevel": False,
-                }
-                return block_id
-            var_id = self._lookup_var_id(variables_map, expr.name)
-            block_id = self._new_block_id()
-            blocks[block_id] = {
-                "opcode": "data_variable",
-                "next": None,
-                "parent": parent_id,
-                "inputs": {},
-                "fields": {"VARIABLE": [expr.name, var_id]},
-                "shadow": False,
-                "topLevel": False,
-            }
-            return block_id
-        if isinstance(expr, PickRandomExpr):
-            block_id = self._new_block_id()
-            blocks[block_id] = {
-                "opcode": "operator_random",
-                "next": None,
-                "parent": parent_id,
-                "inputs": {},
-                "fields": {},
-                "shadow": False,
-                "topLevel": False,
-            }
-            blocks[block_id]["inputs"]["FROM"] = self._expr_input(
-                blocks=blocks,
-                expr=expr.start,
-                parent_id=block_id,
-                variables_map=variables_map,
-                lists_map=lists_map,
-                param_scope=param_scope,
-                default_kind="number",
-            )
-            blocks[block_id]["inputs"]["TO"] = self._expr_input(
-                blocks=blocks,
-                expr=expr.end,
-                parent_id=block_id,
-                variables_map=variables_map,
-                lists_map=lists_map,
-                param_scope=param_scope,
-                default_kind="number",
-            )
-            return block_id
-        if isinstance(expr, ListItemExpr):
+    ) -> str:
+        opcode = _BUILTIN_REPORTER_OPCODES.get(expr.kind)
+        if opcode is None:
+            raise CodegenError(f"Unsupported built-in reporter '{expr.kind}'.")
+        block_id = self._new_block_id()
+        blocks[block_id] = _bare_block(opcode, parent_id)
+        return block_id
+
+    def _emit_var_reporter(
+        self,
+        blocks: dict[str, dict],
+        expr: VarExpr,
+        parent_id: str,
+        variables_map: dict[str, str],
+        lists_map: dict[str, str],
+        param_scope: set[str],
+    ) -> str:
+        if param_scope and expr.name.lower() in param_scope:
             block_id = self._new_block_id()
-            list_id = self._lookup_list_id(lists_map, expr.list_name)
-            blocks[block_id] = {
-                "opcode": "data_itemoflist",
-                "next": None,
-                "parent": parent_id,
-                "inputs": {},
-                "fields": {"LIST": [expr.list_name, list_id]},
-                "shadow": False,
-                "topLevel": False,
-            }
-            blocks[block_id]["inputs"]["INDEX"] = self._expr_input(
-                blocks=blocks,
-                expr=expr.index,
-                parent_id=block_id,
-                variables_map=variables_map,
-                lists_map=lists_map,
-                param_scope=param_scope,
-                default_kind="number",
+            blocks[block_id] = _block(
+                "argument_reporter_string_number",
+                parent_id,
+                fields={"VALUE": [expr.name, None]},
             )
             return block_id
-        if isinstance(expr, ListLengthExpr):
+        var_id = self._lookup_var_id(variables_map, expr.name)
+        block_id = self._new_block_id()
+        blocks[block_id] = _block("data_variable", parent_id, fields={"VARIABLE": [expr.name, var_id]})
+        return block_id
+
+    def _emit_pick_random_reporter(
+        self,
+        blocks: dict[str, dict],
+        expr: PickRandomExpr,
+        parent_id: str,
+        variables_map: dict[str, str],
+        lists_map: dict[str, str],
+        param_scope: set[str],
+    ) -> str:
+        block_id = self._new_block_id()
+        inputs: dict[str, list] = {}
+        blocks[block_id] = _block("operator_random", parent_id, inputs=inputs)
+        inputs["FROM"] = self._expr_input(blocks, expr.start, block_id, variables_map, lists_map, param_scope, "number")
+        inputs["TO"] = self._expr_input(blocks, expr.end, block_id, variables_map, lists_map, param_scope, "number")
+        return block_id
+
+    def _emit_list_item_reporter(
+        self,
+        blocks: dict[str, dict],
+        expr: ListItemExpr,
+        parent_id: str,
+        variables_map: dict[str, str],
+        lists_map: dict[str, str],
+        param_scope: set[str],
+    ) -> str:
+        block_id = self._new_block_id()
+        list_id = self._lookup_list_id(lists_map, expr.list_name)
+        inputs: dict[str, list] = {}
+        blocks[block_id] = _block("data_itemoflist", parent_id, inputs=inputs, fields={"LIST": [expr.list_name, list_id]})
+        inputs["INDEX"] = self._expr_input(blocks, expr.index, block_id, variables_map, lists_map, param_scope, "number")
+        return block_id
+
+    def _emit_list_length_reporter(
+        self,
+        blocks: dict[str, dict],
+        expr: ListLengthExpr,
+        parent_id: str,
+        variables_map: dict[str, str],
+        lists_map: dict[str, str],
+        param_scope: set[str],
+    ) -> str:
+        block_id = self._new_block_id()
+        list_id = self._lookup_list_id(lists_map, expr.list_name)
+        blocks[block_id] = _block("data_lengthoflist", parent_id, fields={"LIST": [expr.list_name, list_id]})
+        return block_id
+
+    def _emit_list_contains_reporter(
+        self,
+        blocks: dict[str, dict],
+        expr: ListContainsExpr,
+        parent_id: str,
+        variables_map: dict[str, str],
+        lists_map: dict[str, str],
+        param_scope: set[str],
+    ) -> str:
+        block_id = self._new_block_id()
+        list_id = self._lookup_list_id(lists_map, expr.list_name)
+        inputs: dict[str, list] = {}
+        blocks[block_id] = _block("data_listcontainsitem", parent_id, inputs=inputs, fields={"LIST": [expr.list_name, list_id]})
+        inputs["ITEM"] = self._expr_input(blocks, expr.item, block_id, variables_map, lists_map, param_scope, "string")
+        return block_id
+
+    def _emit_key_pressed_reporter(
+        self,
+        blocks: dict[str, dict],
+        expr: KeyPressedExpr,
+        parent_id: str,
+        variables_map: dict[str, str],
+        lists_map: dict[str, str],
+        param_scope: set[str],
+    ) -> str:
+        block_id = self._new_block_id()
+        menu_id = self._new_block_id()
+        blocks[block_id] = _block("sensing_keypressed", parent_id, inputs={"KEY_OPTION": [1, menu_id]})
+        key_literal = self._literal_input(expr.key)
+        key_value = "space"
+        if key_literal is not None and key_literal[0] == 10:
+            key_value = str(key_literal[1])
+        blocks[menu_id] = _menu_block("sensing_keyoptions", block_id, {"KEY_OPTION": [key_value, None]})
+        return block_id
+
+    def _emit_unary_expr(
+        self,
+        blocks: dict[str, dict],
+        expr: UnaryExpr,
+        parent_id: str,
+        variables_map: dict[str, str],
+        lists_map: dict[str, str],
+        param_scope: set[str],
+    ) -> str:
+        if expr.op == "-":
             block_id = self._new_block_id()
-            list_id = self._lookup_list_id(lists_map, expr.list_name)
-            blocks[block_id] = {
-                "opcode": "data_lengthoflist",
-                "next": None,
-                "parent": parent_id,
-                "inputs": {},
-                "fields": {"LIST": [expr.list_name, list_id]},
-                "shadow": False,
-                "topLevel": False,
-            }
+            inputs: dict[str, list] = {}
+            blocks[block_id] = _block("operator_subtract", parent_id, inputs=inputs)
+            inputs["NUM1"] = [1, [4, "0"]]
+            inputs["NUM2"] = self._expr_input(blocks, expr.operand, block_id, variables_map, lists_map, param_scope, "number")
             return block_id
-        if isinstance(expr, ListContainsExpr):
+        if expr.op == "not":
             block_id = self._new_block_id()
-            list_id = self._lookup_list_id(lists_map, expr.list_name)
-            blocks[block_id] = {
-                "opcode": "data_listcontainsitem",
-                "next": None,
-                "parent": parent_id,
-                "inputs": {},
-                "fields": {"LIST": [expr.list_name, list_id]},
-                "shadow": False,
-                "topLevel": False,
-            }
-            blocks[block_id]["inputs"]["ITEM"] = self._expr_input(
-                blocks=blocks,
-                expr=expr.item,
-                parent_id=block_id,
-                variables_map=variables_map,
-                lists_map=lists_map,
-                param_scope=param_scope,
-                default_kind="string",
+            blocks[block_id] = _block(
+                "operator_not",
+                parent_id,
+                inputs={
+                    "OPERAND": self._expr_input(blocks, expr.operand, block_id, variables_map, lists_map, param_scope, "boolean")
+                },
             )
             return block_id
-        if isinstance(expr, KeyPressedExpr):
-            block_id = self._new_block_id()
-            menu_id = self._new_block_id()
-            blocks[block_id] = {
-                "opcode": "sensing_keypressed",
-                "next": None,
-                "parent": parent_id,
-                "inputs": {"KEY_OPTION": [1, menu_id]},
-                "fields": {},
-                "shadow": False,
-                "topLevel": False,
-            }
-            key_literal = self._literal_input(expr.key)
-            key_value = "space"
-            if key_literal is not None and key_literal[0] == 10:
-                key_value = str(key_literal[1])
-            blocks[menu_id] = {
-                "opcode": "sensing_keyoptions",
-                "next": None,
-                "parent": block_id,
-                "inputs": {},
-                "fields": {"KEY_OPTION": [key_value, None]},
-                "shadow": True,
-                "topLevel": False,
-            }
-            return block_id
-        if isinstance(expr, UnaryExpr):
-            if expr.op == "-":
-                block_id = self._new_block_id()
-                blocks[block_id] = {
-                    "opcode": "operator_subtract",
-                    "next": None,
-                    "parent": parent_id,
-                    "inputs": {},
-                    "fields": {},
-                    "shadow": False,
-                    "topLevel": False,
-                }
-                blocks[block_id]["inputs"]["NUM1"] = [1, [4, "0"]]
-                blocks[block_id]["inputs"]["NUM2"] = self._expr_input(
-                    blocks=blocks,
-                    expr=expr.operand,
-                    parent_id=block_id,
-                    variables_map=variables_map,
-                    lists_map=lists_map,
-                    param_scope=param_scope,
-                    default_kind="number",
-                )
-                return block_id
-            if expr.op == "not":
-                block_id = self._new_block_id()
-                blocks[block_id] = {
-                    "opcode": "operator_not",
-                    "next": None,
-                    "parent": parent_id,
-                    "inputs": {
-                        "OPERAND": self._expr_input(
-                            blocks=blocks,
-                            expr=expr.operand,
-                            parent_id=block_id,
-                            variables_map=variables_map,
-                            lists_map=lists_map,
-                            param_scope=param_scope,
-                            default_kind="boolean",
-                        )
-                    },
-                    "fields": {},
-                    "shadow": False,
-                    "topLevel": False,
-                }
-                return block_id
-            raise CodegenError(f"Unsupported unary operator '{expr.op}'.")
-        if isinstance(expr, BinaryExpr):
-            return self._emit_binary_expr(blocks, expr, parent_id, variables_map, lists_map, param_scope)
-        raise CodegenError(f"Unsupported expression type '{type(expr).__name__}'.")
+        raise CodegenError(f"Unsupported unary operator '{expr.op}'.")
 
     def _emit_binary_expr(
         self,
@@ -1378,75 +1187,56 @@ class _ProjectBuilder:
         param_scope: set[str],
     ) -> str:
         if expr.op in {"<=", ">="}:
-            op_first = "<" if expr.op == "<=" else ">"
-            first = BinaryExpr(line=expr.line, column=expr.column, op=op_first, left=expr.left, right=expr.right)
-            second = BinaryExpr(line=expr.line, column=expr.column, op="=", left=expr.left, right=expr.right)
-            rewritten = BinaryExpr(line=expr.line, column=expr.column, op="or", left=first, right=second)
-            return self._emit_binary_expr(blocks, rewritten, parent_id, variables_map, lists_map, param_scope)
-        opcode_map = {
-            "+": "operator_add",
-            "-": "operator_subtract",
-            "*": "operator_multiply",
-            "/": "operator_divide",
-            "%": "operator_mod",
-            "<": "operator_lt",
-            ">": "operator_gt",
-            "=": "operator_equals",
-            "==": "operator_equals",
-            "and": "operator_and",
-            "or": "operator_or",
-        }
+            # Lowered to (a < b) or (a = b); each comparison needs its own
+            # operand blocks since a Scratch block has exactly one parent.
+            block_id = self._new_block_id()
+            inputs: dict[str, list] = {}
+            blocks[block_id] = _block("operator_or", parent_id, inputs=inputs)
+            strict_opcode = "operator_lt" if expr.op == "<=" else "operator_gt"
+            inputs["OPERAND1"] = [
+                2,
+                self._emit_operator_block(
+                    blocks, strict_opcode, expr.left, expr.right, block_id, variables_map, lists_map, param_scope
+                ),
+            ]
+            inputs["OPERAND2"] = [
+                2,
+                self._emit_operator_block(
+                    blocks, "operator_equals", expr.left, expr.right, block_id, variables_map, lists_map, param_scope
+                ),
+            ]
+            return block_id
         if expr.op == "!=":
-            equals_expr = BinaryExpr(line=expr.line, column=expr.column, op="=", left=expr.left, right=expr.right)
-            not_expr = UnaryExpr(line=expr.line, column=expr.column, op="not", operand=equals_expr)
-            reporter = self._emit_expr_reporter(blocks, not_expr, parent_id, variables_map, lists_map, param_scope)
-            if reporter is None:
-                raise CodegenError("Failed to emit inequality expression.")
-            return reporter
-        opcode = opcode_map.get(expr.op)
+            block_id = self._new_block_id()
+            equals_id = self._emit_operator_block(
+                blocks, "operator_equals", expr.left, expr.right, block_id, variables_map, lists_map, param_scope
+            )
+            blocks[block_id] = _block("operator_not", parent_id, inputs={"OPERAND": [2, equals_id]})
+            return block_id
+        opcode = _BINARY_OPCODES.get(expr.op)
         if opcode is None:
             raise CodegenError(f"Unsupported binary operator '{expr.op}'.")
-        block_id = self._new_block_id()
-        blocks[block_id] = {
-            "opcode": opcode,
-            "next": None,
-            "parent": parent_id,
-            "inputs": {},
-            "fields": {},
-            "shadow": False,
-            "topLevel": False,
-        }
-        input_map = {
-            "operator_add": ("NUM1", "NUM2", "number"),
-            "operator_subtract": ("NUM1", "NUM2", "number"),
-            "operator_multiply": ("NUM1", "NUM2", "number"),
-            "operator_divide": ("NUM1", "NUM2", "number"),
-            "operator_mod": ("NUM1", "NUM2", "number"),
-            "operator_lt": ("OPERAND1", "OPERAND2", "number"),
-            "operator_gt": ("OPERAND1", "OPERAND2", "number"),
-            "operator_equals": ("OPERAND1", "OPERAND2", "string"),
-            "operator_and": ("OPERAND1", "OPERAND2", "boolean"),
-            "operator_or": ("OPERAND1", "OPERAND2", "boolean"),
-        }
-        left_key, right_key, kind = input_map[opcode]
-        blocks[block_id]["inputs"][left_key] = self._expr_input(
-            blocks=blocks,
-            expr=expr.left,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            param_scope=param_scope,
-            default_kind=kind,
-        )
-        blocks[block_id]["inputs"][right_key] = self._expr_input(
-            blocks=blocks,
-            expr=expr.right,
-            parent_id=block_id,
-            variables_map=variables_map,
-            lists_map=lists_map,
-            param_scope=param_scope,
-            default_kind=kind,
+        return self._emit_operator_block(
+            blocks, opcode, expr.left, expr.right, parent_id, variables_map, lists_map, param_scope
         )
+
+    def _emit_operator_block(
+        self,
+        blocks: dict[str, dict],
+        opcode: str,
+        left: Expr,
+        right: Expr,
+        parent_id: str,
+        variables_map: dict[str, str],
+        lists_map: dict[str, str],
+        param_scope: set[str],
+    ) -> str:
+        block_id = self._new_block_id()
+        inputs: dict[str, list] = {}
+        blocks[block_id] = _block(opcode, parent_id, inputs=inputs)
+        left_key, right_key, kind = _BINARY_INPUTS[opcode]
+        inputs[left_key] = self._expr_input(blocks, left, block_id, variables_map, lists_map, param_scope, kind)
+        inputs[right_key] = self._expr_input(blocks, right, block_id, variables_map, lists_map, param_scope, kind)
         return block_id
 
     def _literal_input(self, expr: Expr) -> list | None:
@@ -1463,13 +1253,17 @@ class _ProjectBuilder:
         return [10, ""]
 
     def _lookup_var_id(self, variables_map: dict[str, str], var_name: str) -> str:
-        var_id = variables_map.get(var_name.lower())
+        var_id = variables_map.get(var_name)
+        if var_id is None:
+            var_id = variables_map.get(var_name.lower())
         if var_id is None:
             raise CodegenError(f"Variable '{var_name}' is not declared.")
         return var_id
 
     def _lookup_list_id(self, lists_map: dict[str, str], list_name: str) -> str:
-        list_id = lists_map.get(list_name.lower())
+        list_id = lists_map.get(list_name)
+        if list_id is None:
+            list_id = lists_map.get(list_name.lower())
         if list_id is None:
             raise CodegenError(f"List '{list_name}' is not declared.")
         return list_id
@@ -1484,8 +1278,8 @@ class _ProjectBuilder:
 
         costume_json: list[dict] = []
         for idx, costume in enumerate(costumes, start=1):
-            rotation_center_x = 0.0
-            rotation_center_y = 0.0
+            data: bytes | None
+            cache_key: Path | str = costume.path
             if costume.path == "__default_stage_backdrop__.svg":
                 data = DEFAULT_STAGE_SVG
                 ext = "svg"
@@ -1495,15 +1289,8 @@ class _ProjectBuilder:
                 ext = "svg"
                 name = f"costume{idx}"
             else:
-                file_path = Path(costume.path)
-                if not file_path.is_absolute():
-                    candidates = [
-                        self.source_dir / file_path,
-                        self.source_dir.parent / file_path,
-                        Path.cwd() / file_path,
-                    ]
-                    file_path = next((candidate for candidate in candidates if candidate.exists()), candidates[0])
-                if not file_path.exists() or not file_path.is_file():
+                file_path = self._resolve_costume_path(costume.path)
+                if not os.path.isfile(file_path):
                     raise CodegenError(
                         f"Costume file not found for target '{target.name}': '{costume.path}' resolved to '{file_path}'."
                     )
@@ -1512,15 +1299,37 @@ class _ProjectBuilder:
                     raise CodegenError(
                         f"Unsupported costume format '{file_path.suffix}' for '{file_path}'. Only .svg and .png are supported."
                     )
-                data = file_path.read_bytes()
+                data = None
+                cache_key = file_path
                 name = file_path.stem
 
-            if ext == "svg":
-                data, rotation_center_x, rotation_center_y = self._prepare_svg(data=data, source_name=costume.path)
-
-            digest = hashlib.md5(data).hexdigest()
+            # Costumes shared between targets (and the default costumes) are
+            # read and hashed only once per build; each path maps to a content
+            # key, so identical files under different paths share one prepared
+            # asset.
+            content_key = self._costume_keys.get(cache_key)
+            if content_key is None:
+                source = self._costume_sources.get(file_path) if data is None else None
+                if source is None:
+                    if data is None:
+                        data = file_path.read_bytes()
+                    source_digest = hashlib.md5(data).hexdigest()
+                else:
+                    data, source_digest = source
+                content_key = (ext, source_digest)
+                self._costume_keys[cache_key] = content_key
+                asset = self._costume_assets.get(content_key)
+                if asset is None:
+                    asset = self._prepare_costume_asset(
+                        data=data, ext=ext, source_name=costume.path, source_digest=source_digest
+                    )
+                    self._costume_assets[content_key] = asset
+            else:
+                asset = self._costume_assets[content_key]
+            digest, data, rotation_center_x, rotation_center_y = asset
             md5ext = f"{digest}.{ext}"
-            self.assets[md5ext] = data
+            if md5ext not in self.assets:
+                self.assets[md5ext] = data
             entry = {
                 "name": name,
                 "assetId": digest,
@@ -1534,7 +1343,57 @@ class _ProjectBuilder:
             costume_json.append(entry)
         return costume_json
 
+    def _resolve_costume_path(self, path: str) -> Path:
+        # The same costume path is usually referenced by several targets (and
+        # resolved again by the prefetch pass), so resolve each one once.
+        file_path = self._resolved_costume_paths.get(path)
+        if file_path is not None:
+            return file_path
+        file_path = Path(path)
+        if not file_path.is_absolute():
+            primary = self.source_dir / file_path
+            file_path = primary
+            if not os.path.exists(primary):
+                for candidate in (self.source_dir.parent / path, Path.cwd() / path):
+                    if os.path.exists(candidate):
+                        file_path = candidate
+                        break
+        self._resolved_costume_paths[path] = file_path
+        return file_path
+
+    def _load_costume_sources(self) -> None:
+        # Reading and hashing costume files is mostly I/O and C-level MD5,
+        # both of which release the GIL, so distinct files are loaded in
+        # parallel up front. Anything unreadable here is left for
+        # _build_costumes to report in its usual order.
+        file_paths: list[Path] = []
+        seen: set[Path] = set()
+        for target in self.project.targets:
+            for costume in target.costumes:
+                file_path = self._resolve_costume_path(costume.path)
+                if file_path not in seen and file_path.suffix.lower() in {".svg", ".png"} and os.path.isfile(file_path):
+                    seen.add(file_path)
+                    file_paths.append(file_path)
+        if len(file_paths) < 2:
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(file_paths))) as pool:
+            for file_path, source in zip(file_paths, pool.map(_read_costume_source, file_paths)):
+                if source is not None:
+                    self._costume_sources[file_path] = source
+
+    def _prepare_costume_asset(
+        self, data: bytes, ext: str, source_name: str, source_digest: str
+    ) -> tuple[str, bytes, float, float]:
+        if ext == "svg":
+            data, rotation_center_x, rotation_center_y = self._prepare_svg(data=data, source_name=source_name)
+            return hashlib.md5(data).hexdigest(), data, rotation_center_x, rotation_center_y
+        # Bitmaps are stored as-is, so the source digest is the asset id.
+        return source_digest, data, 0.0, 0.0
+
     def _prepare_svg(self, data: bytes, source_name: str) -> tuple[bytes, float, float]:
+        prepared = self._prepare_svg_bytes(data, source_name)
+        if prepared is not None:
+            return prepared
         try:
             root = ET.fromstring(data)
         except ET.ParseError as exc:
@@ -1556,12 +1415,7 @@ class _ProjectBuilder:
         height: float,
         target_size: float,
     ) -> ET.Element:
-        scale_x = target_size / width
-        scale_y = target_size / height
-        transform = (
-            f"translate({self._fmt(-min_x)} {self._fmt(-min_y)}) "
-            f"scale({self._fmt(scale_x)} {self._fmt(scale_y)})"
-        )
+        transform = self._svg_transform(min_x, min_y, width, height, target_size)
         group_tag = self._svg_tag(root, "g")
         wrapper = ET.Element(group_tag, {"transform": transform})
         children = list(root)
@@ -1574,7 +1428,89 @@ class _ProjectBuilder:
         root.append(wrapper)
         return root
 
-    def _read_svg_bounds(self, root: ET.Element, source_name: str) -> tuple[float, float, float, float]:
+    def _prepare_svg_bytes(self, data: bytes, source_name: str) -> tuple[bytes, float, float] | None:
+        """Rewrite the root <svg> tag in place, or return None to use ElementTree.
+
+        Only documents whose root tag carries plain double-quoted attributes
+        are handled here; anything else goes through the full DOM path.
+        """
+        root_match = _SVG_ROOT_PATTERN.match(data)
+        if root_match is None:
+            return None
+        raw_attrs = root_match.group("attrs")
+        if not _SVG_ATTRS_PATTERN.fullmatch(raw_attrs):
+            return None
+        try:
+            attrs = {name.decode("ascii"): value.decode("utf-8") for name, value in _SVG_ATTR_PATTERN.findall(raw_attrs)}
+        except UnicodeDecodeError:
+            return None
+        # Well-formedness is still checked, but without building a tree. The
+        # parse also reports where the root element starts and ends, so the
+        # splice points come from expat rather than from searching the bytes.
+        checker = expat.ParserCreate(namespace_separator="}")
+        depth = 0
+        root_bounds: list[int] = []
+
+        def start_element(name: str, attributes: dict[str, str]) -> None:
+            nonlocal depth
+            if depth == 0:
+                root_bounds.append(checker.CurrentByteIndex)
+            depth += 1
+
+        def end_element(name: str) -> None:
+            nonlocal depth
+            depth -= 1
+            if depth == 0:
+                root_bounds.append(checker.CurrentByteIndex)
+
+        checker.StartElementHandler = start_element
+        checker.EndElementHandler = end_element
+        try:
+            checker.Parse(data, True)
+        except expat.ExpatError as exc:
+            raise CodegenError(f"Invalid SVG file '{source_name}': {exc}.") from exc
+        if len(root_bounds) != 2 or root_bounds[0] != root_match.start("tag"):
+            return None
+        body_end = root_bounds[1]
+        if body_end < root_match.end() or not data.startswith(b"</", body_end):
+            return None
+
+        min_x, min_y, width, height = self._read_svg_bounds(attrs, source_name)
+        if not self.scale_svgs:
+            return data, width / 2.0, height / 2.0
+
+        size = self._fmt(DEFAULT_SVG_TARGET_SIZE)
+        transform = self._svg_transform(min_x, min_y, width, height, DEFAULT_SVG_TARGET_SIZE)
+        kept_attrs = _SVG_SIZE_ATTR_PATTERN.sub(b"", raw_attrs).rstrip()
+        root_tag = b'<svg%s viewBox="0 0 %s %s" width="%s" height="%s">' % (
+            kept_attrs,
+            size.encode(),
+            size.encode(),
+            size.encode(),
+            size.encode(),
+        )
+        rewritten = b"".join(
+            (
+                data[: root_match.start("tag")],
+                root_tag,
+                b'<g transform="%s">' % transform.encode(),
+                data[root_match.end() : body_end],
+                b"</g>",
+                data[body_end:],
+            )
+        )
+        centered = DEFAULT_SVG_TARGET_SIZE / 2.0
+        return rewritten, centered, centered
+
+    def _svg_transform(self, min_x: float, min_y: float, width: float, height: float, target_size: float) -> str:
+        scale_x = target_size / width
+        scale_y = target_size / height
+        return (
+            f"translate({self._fmt(-min_x)} {self._fmt(-min_y)}) "
+            f"scale({self._fmt(scale_x)} {self._fmt(scale_y)})"
+        )
+
+    def _read_svg_bounds(self, root: ET.Element | dict[str, str], source_name: str) -> tuple[float, float, float, float]:
         view_box = root.get("viewBox")
         if view_box:
             parsed = self._parse_view_box(view_box, source_name)
@@ -1588,7 +1524,7 @@ class _ProjectBuilder:
         return 0.0, 0.0, DEFAULT_SVG_TARGET_SIZE, DEFAULT_SVG_TARGET_SIZE
 
     def _parse_view_box(self, view_box: str, source_name: str) -> tuple[float, float, float, float] | None:
-        parts = [piece for piece in re.split(r"[\s,]+", view_box.strip()) if piece]
+        parts = view_box.replace(",", " ").split()
         if len(parts) != 4:
             return None
         try:
@@ -1602,7 +1538,7 @@ class _ProjectBuilder:
     def _parse_svg_length(self, value: str | None) -> float | None:
         if value is None:
             return None
-        match = re.match(r"^\s*([+-]?(?:\d+(?:\.\d*)?|\.\d+))", value)
+        match = _SVG_LENGTH_PATTERN.match(value)
         if not match:
             return None
         number = float(match.group(1))
@@ -1616,42 +1552,74 @@ class _ProjectBuilder:
             return f"{{{namespace}}}{name}"
         return name
 
-    def _fmt(self, value: float) -> str:
-        if float(value).is_integer():
-            return str(int(value))
-        return f"{value:.6f}".rstrip("0").rstrip(".")
+    _fmt = staticmethod(_format_number)
 
     def _collect_broadcast_ids(self) -> dict[str, str]:
         messages: set[str] = set()
+        pending: list[Statement] = []
         for target in self.project.targets:
             for script in target.scripts:
                 if script.event_type == "when_i_receive" and script.message:
                     messages.add(script.message)
-                self._collect_messages_from_statements(script.body, messages)
+                pending.extend(script.body)
             for procedure in target.procedures:
-                self._collect_messages_from_statements(procedure.body, messages)
-        return {message: self._new_id("broadcast") for message in sorted(messages)}
-
-    def _collect_messages_from_statements(self, statements: list[Statement], messages: set[str]) -> None:
-        for stmt in statements:
-            if isinstance(stmt, BroadcastStmt):
+                pending.extend(procedure.body)
+        # One explicit stack over every statement; only broadcasts and the
+        # statements that nest bodies matter here.
+        while pending:
+            stmt = pending.pop()
+            stmt_type = type(stmt)
+            if stmt_type is BroadcastStmt:
                 messages.add(stmt.message)
-            elif isinstance(stmt, RepeatStmt):
-                self._collect_messages_from_statements(stmt.body, messages)
-            elif isinstance(stmt, IfStmt):
-                self._collect_messages_from_statements(stmt.then_body, messages)
-                self._collect_messages_from_statements(stmt.else_body, messages)
+            elif stmt_type is RepeatStmt or stmt_type is ForeverStmt:
+                pending.extend(stmt.body)
+            elif stmt_type is IfStmt:
+                pending.extend(stmt.then_body)
+                pending.extend(stmt.else_body)
+        return {message: self._new_id("broadcast") for message in sorted(messages)}
 
     def _broadcast_id(self, message: str) -> str:
         broadcast_id = self.broadcast_ids.get(message)
         if broadcast_id is None:
             broadcast_id = self._new_id("broadcast")
             self.broadcast_ids[message] = broadcast_id
+            self._stage_broadcasts[broadcast_id] = message
         return broadcast_id
 
     def _new_id(self, prefix: str) -> str:
-        self._id_counter += 1
-        return f"{prefix}_{self._id_counter}"
+        return f"{prefix}_{self._new_block_id()}"
 
     def _new_block_id(self) -> str:
-        return self._new_id("block")
+        return next(self._block_ids)
+
+
+_STATEMENT_EMITTERS: dict[type, Callable[..., str]] = {
+    BroadcastStmt: _ProjectBuilder._emit_broadcast_stmt,
+    SetVarStmt: _ProjectBuilder._emit_set_stmt,
+    ChangeVarStmt: _ProjectBuilder._emit_change_stmt,
+    GoToXYStmt: _ProjectBuilder._emit_go_to_xy_stmt,
+    ForeverStmt: _ProjectBuilder._emit_forever_stmt,
+    StopStmt: _ProjectBuilder._emit_stop_stmt,
+    AddToListStmt: _ProjectBuilder._emit_add_to_list_stmt,
+    DeleteOfListStmt: _ProjectBuilder._emit_delete_of_list_stmt,
+    DeleteAllOfListStmt: _ProjectBuilder._emit_delete_all_of_list_stmt,
+    InsertAtListStmt: _ProjectBuilder._emit_insert_at_list_stmt,
+    ReplaceItemOfListStmt: _ProjectBuilder._emit_replace_item_of_list_stmt,
+    RepeatStmt: _ProjectBuilder._emit_repeat_stmt,
+    IfStmt: _ProjectBuilder._emit_if_stmt,
+    ProcedureCallStmt: _ProjectBuilder._emit_call_stmt,
+    **{stmt_type: _ProjectBuilder._emit_mapped_single_input_stmt for stmt_type in _SINGLE_INPUT_STMTS},
+    **{stmt_type: _ProjectBuilder._emit_mapped_no_input_stmt for stmt_type in _NO_INPUT_STMTS},
+}
+
+_EXPR_EMITTERS: dict[type, Callable[..., str | None]] = {
+    BuiltinReporterExpr: _ProjectBuilder._emit_builtin_reporter,
+    VarExpr: _ProjectBuilder._emit_var_reporter,
+    PickRandomExpr: _ProjectBuilder._emit_pick_random_reporter,
+    ListItemExpr: _ProjectBuilder._emit_list_item_reporter,
+    ListLengthExpr: _ProjectBuilder._emit_list_length_reporter,
+    ListContainsExpr: _ProjectBuilder._emit_list_contains_reporter,
+    KeyPressedExpr: _ProjectBuilder._emit_key_pressed_reporter,
+    UnaryExpr: _ProjectBuilder._emit_unary_expr,
+    BinaryExpr: _ProjectBuilder._emit_binary_expr,
+}
@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+import copy
+import hashlib
+import os
+import pickle
 import re
+import sys
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 from parser import CostumeDecl, Parser, Project, Target
@@ -11,14 +19,14 @@ class ImportResolutionError(ValueError):
     """Raised when resolving top-level imports fails."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ImportSpec:
     sprite_name: str
     relative_path: str
     line: int
 
 
-@dataclass
+@dataclass(slots=True)
 class _ResolvedFile:
     local_targets: list[Target]
     combined_targets: list[Target]
@@ -28,6 +36,23 @@ IMPORT_PATTERN = re.compile(
     r'^\s*import\s+\[(?P<name>[^\]\r\n]+)\]\s+from\s+"(?P<path>[^"\r\n]+)"\s*(?:#.*)?$',
     re.IGNORECASE,
 )
+# Any line IMPORT_PATTERN accepts contains this, under the same case folding.
+_IMPORT_KEYWORD = re.compile("import", re.IGNORECASE)
+# Finds a line whose first non-blank character does not open a comment; line
+# starts follow str.splitlines().
+_CODE_LINE_PATTERN = re.compile(r"(?:\A|(?<=[\n\r\v\f\x1c-\x1e\x85\u2028\u2029]))\s*[^\s#]")
+# One line with its terminator, splitting exactly where str.splitlines does.
+_LINE_PATTERN = re.compile(
+    "[^\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]*(?:\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029])?"
+)
+
+# Parsed targets are cached on disk keyed by the stripped source, so unchanged
+# files (typically shared sprite libraries) skip the lexer and parser entirely.
+# Set SBTEXT_CACHE_DIR to relocate the cache, or to an empty string to disable it.
+# Entries are pickles, so the directory is only used when it is private to the
+# current user; the least recently used entries are pruned past the size cap.
+_PARSE_CACHE_ENV = "SBTEXT_CACHE_DIR"
+_PARSE_CACHE_MAX_ENTRIES = 512
 
 
 def resolve_project_from_path(entry_path: Path) -> Project:
@@ -35,12 +60,21 @@ def resolve_project_from_path(entry_path: Path) -> Project:
     if not resolved_entry.exists() or not resolved_entry.is_file():
         raise ImportResolutionError(f"Input file not found: '{entry_path}'.")
     cache: dict[Path, _ResolvedFile] = {}
-    resolved = _resolve_file(path=resolved_entry, stack=[], cache=cache)
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        resolved = _resolve_file(path=resolved_entry, stack=[], cache=cache, executor=executor, pending={})
     _ensure_unique_sprite_names(resolved.combined_targets)
-    return Project(line=1, column=1, targets=list(resolved.combined_targets))
+    # combined_targets is built fresh for each file and the cache dies with
+    # this call, so the project can take the list over without a copy.
+    return Project(line=1, column=1, targets=resolved.combined_targets)
 
 
-def _resolve_file(path: Path, stack: list[Path], cache: dict[Path, _ResolvedFile]) -> _ResolvedFile:
+def _resolve_file(
+    path: Path,
+    stack: list[Path],
+    cache: dict[Path, _ResolvedFile],
+    executor: ThreadPoolExecutor,
+    pending: dict[Path, Future[tuple[list[ImportSpec], list[Target]]]],
+) -> _ResolvedFile:
     cached = cache.get(path)
     if cached is not None:
         return cached
@@ -50,22 +84,31 @@ def _resolve_file(path: Path, stack: list[Path], cache: dict[Path, _ResolvedFile
         cycle_text = " -> ".join(str(p) for p in cycle)
         raise ImportResolutionError(f"Circular import detected: {cycle_text}")
 
-    source = path.read_text(encoding="utf-8")
-    imports, stripped_source = _extract_imports(source=source, source_path=path)
-    local_targets = _parse_local_targets(stripped_source)
-    _normalize_target_asset_paths(local_targets=local_targets, source_dir=path.parent)
+    future = pending.pop(path, None)
+    imports, local_targets = future.result() if future is not None else _load_file(path)
+    child_paths = [(path.parent / spec.relative_path).resolve() for spec in imports]
+    # Sibling imports are read and parsed ahead on the pool; resolution below
+    # still walks them in order, so errors surface exactly as before.
+    to_load = [
+        child_path
+        for child_path in dict.fromkeys(child_paths)
+        if child_path not in cache and child_path not in pending and child_path not in stack and child_path != path
+    ]
+    if len(to_load) > 1:
+        for child_path in to_load:
+            if child_path.is_file():
+                pending[child_path] = executor.submit(_load_file, child_path)
 
     stack.append(path)
     try:
         imported_targets: list[Target] = []
-        for spec in imports:
-            child_path = (path.parent / spec.relative_path).resolve()
+        for spec, child_path in zip(imports, child_paths):
             if not child_path.exists() or not child_path.is_file():
                 raise ImportResolutionError(
                     f"Imported file does not exist: '{spec.relative_path}' "
                     f"(from '{path}', line {spec.line})."
                 )
-            child = _resolve_file(path=child_path, stack=stack, cache=cache)
+            child = _resolve_file(path=child_path, stack=stack, cache=cache, executor=executor, pending=pending)
             _validate_imported_file(spec=spec, source_path=path, child_path=child_path, local_targets=child.local_targets)
             imported_targets.extend(child.combined_targets)
     finally:
@@ -76,18 +119,44 @@ def _resolve_file(path: Path, stack: list[Path], cache: dict[Path, _ResolvedFile
     return resolved
 
 
+def _load_file(path: Path) -> tuple[list[ImportSpec], list[Target]]:
+    source = _read_source(path)
+    imports, stripped_source = _extract_imports(source=source, source_path=path)
+    local_targets = _parse_local_targets(stripped_source)
+    _normalize_target_asset_paths(local_targets=local_targets, source_dir=path.parent)
+    return imports, local_targets
+
+
+def _read_source(path: Path) -> str:
+    # One read and one decode, without a text-mode file object; newlines are
+    # normalized the way read_text's universal-newline mode would.
+    source = path.read_bytes().decode("utf-8")
+    if "\r" in source:
+        source = source.replace("\r\n", "\n").replace("\r", "\n")
+    return source
+
+
 def _extract_imports(source: str, source_path: Path) -> tuple[list[ImportSpec], str]:
+    if _IMPORT_KEYWORD.search(source) is None:
+        # No line can be an import, so only the leading BOM needs stripping.
+        return [], source.lstrip("\ufeff")
     imports: list[ImportSpec] = []
     output_lines: list[str] = []
     saw_non_import_code = False
-    lines = source.splitlines(keepends=True)
+    length = len(source)
+    match_import = IMPORT_PATTERN.match
 
-    for line_no, line in enumerate(lines, start=1):
-        current_line = line
+    # Lines are pulled lazily so the scan can stop at the first code line
+    # without splitting the rest of the file.
+    for line_no, line_match in enumerate(_LINE_PATTERN.finditer(source), start=1):
+        if line_match.start() == length:
+            break
+        current_line = line_match.group()
+        offset = line_match.end()
         if line_no == 1 and current_line.startswith("\ufeff"):
             current_line = current_line.lstrip("\ufeff")
         stripped_nl = current_line.rstrip("\r\n")
-        match = IMPORT_PATTERN.match(stripped_nl)
+        match = match_import(stripped_nl)
         if match:
             if saw_non_import_code:
                 raise ImportResolutionError(
@@ -104,17 +173,147 @@ def _extract_imports(source: str, source_path: Path) -> tuple[list[ImportSpec],
             output_lines.append("\n" if current_line.endswith("\n") else "")
             continue
 
-        if not _is_blank_or_comment(stripped_nl):
-            saw_non_import_code = True
         output_lines.append(current_line)
+        if not saw_non_import_code and not _is_blank_or_comment(stripped_nl):
+            saw_non_import_code = True
+            if _IMPORT_KEYWORD.search(source, offset) is None:
+                # Nothing below can be a misplaced import; keep it verbatim.
+                output_lines.append(source[offset:])
+                break
     return imports, "".join(output_lines)
 
 
 def _parse_local_targets(source: str) -> list[Target]:
-    if not any(not _is_blank_or_comment(line) for line in source.splitlines()):
+    if _CODE_LINE_PATTERN.search(source) is None:
         return []
-    project = Parser.from_source(source)
-    return list(project.targets)
+    # Asset path normalization reassigns target.costumes, so each caller gets
+    # its own shallow copies of the memoized targets.
+    return [copy.copy(target) for target in _parse_targets(source)]
+
+
+@lru_cache(maxsize=256)
+def _parse_targets(source: str) -> tuple[Target, ...]:
+    cache_path = _parse_cache_path(source)
+    if cache_path is not None:
+        cached = _load_parsed_targets(cache_path)
+        if cached is not None:
+            return cached
+    targets = Parser.from_source(source).targets
+    if cache_path is not None:
+        _store_parsed_targets(cache_path, targets)
+    return tuple(targets)
+
+
+def _parse_cache_path(source: str) -> Path | None:
+    cache_dir = _parse_cache_dir()
+    fingerprint = _grammar_fingerprint()
+    if cache_dir is None or fingerprint is None:
+        return None
+    digest = hashlib.blake2b(source.encode("utf-8"), digest_size=16, key=fingerprint)
+    return cache_dir / f"{digest.hexdigest()}.pkl"
+
+
+@lru_cache(maxsize=None)
+def _parse_cache_dir() -> Path | None:
+    configured = os.environ.get(_PARSE_CACHE_ENV)
+    if configured is not None:
+        if not configured:
+            return None
+        cache_dir = Path(configured)
+    else:
+        cache_home = os.environ.get("XDG_CACHE_HOME")
+        try:
+            base = Path(cache_home) if cache_home else Path.home() / ".cache"
+        except RuntimeError:
+            return None
+        cache_dir = base / "sbtext" / "parsed"
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        info = cache_dir.stat()
+    except OSError:
+        return None
+    # Never unpickle from a directory another user could have written to.
+    getuid = getattr(os, "getuid", None)
+    if getuid is not None and (info.st_uid != getuid() or info.st_mode & 0o022):
+        return None
+    return cache_dir
+
+
+@lru_cache(maxsize=None)
+def _grammar_fingerprint() -> bytes | None:
+    # Any change to the lexer or parser sources invalidates every entry.
+    digest = hashlib.blake2b(digest_size=16)
+    for module_name in ("lexer", "parser"):
+        module_file = getattr(sys.modules.get(module_name), "__file__", None)
+        if module_file is None:
+            return None
+        try:
+            digest.update(Path(module_file).read_bytes())
+        except OSError:
+            return None
+    digest.update(sys.version.encode("utf-8"))
+    return digest.digest()
+
+
+def _load_parsed_targets(cache_path: Path) -> tuple[Target, ...] | None:
+    try:
+        with cache_path.open("rb") as handle:
+            targets = pickle.load(handle)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, TypeError, ValueError):
+        targets = None
+    if not isinstance(targets, list) or not all(isinstance(target, Target) for target in targets):
+        # Corrupt or foreign entry: drop it so the fresh parse replaces it.
+        try:
+            cache_path.unlink()
+        except OSError:
+            pass
+        return None
+    try:
+        # The mtime doubles as the last-use time for pruning.
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return tuple(targets)
+
+
+def _store_parsed_targets(cache_path: Path, targets: list[Target]) -> None:
+    try:
+        fd, temp_name = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump(targets, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, cache_path)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+    except (OSError, pickle.PicklingError):
+        return
+    _prune_parse_cache(cache_path.parent)
+
+
+def _prune_parse_cache(cache_dir: Path) -> None:
+    try:
+        entries = list(os.scandir(cache_dir))
+    except OSError:
+        return
+    cached_files: list[tuple[float, str]] = []
+    for entry in entries:
+        if not entry.name.endswith(".pkl"):
+            continue
+        try:
+            cached_files.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            continue
+    if len(cached_files) <= _PARSE_CACHE_MAX_ENTRIES:
+        return
+    cached_files.sort()
+    for _, path in cached_files[: len(cached_files) - _PARSE_CACHE_MAX_ENTRIES]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
 
 
 def _validate_imported_file(spec: ImportSpec, source_path: Path, child_path: Path, local_targets: list[Target]) -> None:
@@ -154,20 +353,33 @@ def _ensure_unique_sprite_names(targets: list[Target]) -> None:
 
 
 def _normalize_target_asset_paths(local_targets: list[Target], source_dir: Path) -> None:
+    search_dirs: tuple[Path, ...] | None = None
     for target in local_targets:
+        if not target.costumes:
+            continue
+        if search_dirs is None:
+            search_dirs = (source_dir, source_dir.parent, Path.cwd())
         normalized_costumes: list[CostumeDecl] = []
         for costume in target.costumes:
             costume_path = Path(costume.path)
             if costume_path.is_absolute():
                 normalized_costumes.append(costume)
-            else:
-                candidates = [
-                    (source_dir / costume_path).resolve(),
-                    (source_dir.parent / costume_path).resolve(),
-                    (Path.cwd() / costume_path).resolve(),
-                ]
+                continue
+            if ".." in costume_path.parts:
+                # resolve() folds ".." lexically, so existence must be checked
+                # on the resolved candidates.
+                candidates = [(base / costume_path).resolve() for base in search_dirs]
                 absolute_path = next((candidate for candidate in candidates if candidate.exists()), candidates[0])
-                normalized_costumes.append(CostumeDecl(line=costume.line, column=costume.column, path=str(absolute_path)))
+            else:
+                # Only the winning candidate pays for resolve().
+                for base in search_dirs:
+                    candidate = base / costume_path
+                    if os.path.exists(candidate):
+                        break
+                else:
+                    candidate = source_dir / costume_path
+                absolute_path = candidate.resolve()
+            normalized_costumes.append(CostumeDecl(line=costume.line, column=costume.column, path=str(absolute_path)))
         target.costumes = normalized_costumes
 
 
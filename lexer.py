@@ -1,21 +1,25 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import re
+import string
+import sys
+from typing import NamedTuple
 
 
 class LexerError(ValueError):
     """Raised when tokenization fails."""
 
 
-@dataclass(frozen=True)
-class Token:
+# A NamedTuple rather than a frozen dataclass: construction skips the frozen
+# __setattr__ guard and instances carry no __dict__.
+class Token(NamedTuple):
     type: str
     value: str
     line: int
     column: int
 
 
-KEYWORDS = {
+KEYWORDS = frozenset({
     "add",
     "and",
     "all",
@@ -85,7 +89,7 @@ KEYWORDS = {
     "with",
     "x",
     "y",
-}
+})
 
 
 SYMBOLS = {
@@ -97,141 +101,204 @@ SYMBOLS = {
 }
 
 
+# Master pattern for the common ASCII tokens, tried in one SRE match per token
+# together with any whitespace in front of it. Anything it does not cover
+# (non-ASCII starts, strings with escapes, stray characters) falls through to
+# the hand-written readers below.
+_TOKEN_PATTERN = re.compile(
+    r"""
+    [ \t\r\ufeff]*
+    (?:
+    (?P<newline>\n)
+    | (?P<comment>\#[^\n]*)
+    | (?P<identifier>[A-Za-z_][\w?]*)
+    | (?P<number>[0-9]+(?:\.[0-9]*)?)
+    | (?P<string>"[^"\\\n]*")
+    | (?P<single>[-+*/%()\[\],])
+    | (?P<relational>[=!<>]=?)
+    )?
+    """,
+    re.VERBOSE,
+)
+_NEWLINE, _COMMENT, _IDENTIFIER, _NUMBER, _STRING, _SINGLE, _RELATIONAL = range(1, 8)
+
+# Maps each keyword to one shared, interned string, so KEYWORD tokens reuse it
+# instead of carrying their own copy of the source text. Token types are
+# likewise always the interned literals below; the parser compares both by
+# identity.
+_KEYWORD_VALUES = {keyword: sys.intern(keyword) for keyword in KEYWORDS}
+
+_SINGLE_CHAR_TYPES = {**SYMBOLS, **dict.fromkeys("+-*/%", "OP")}
+
+# ASCII identifier characters; anything else falls back to str.isalnum().
+_IDENTIFIER_CHARS = frozenset(string.ascii_letters + string.digits + "_?")
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+_STRING_STOP_PATTERN = re.compile(r'["\\\n]')
+
+
 class Lexer:
     def __init__(self, source: str) -> None:
         self.source = source
         self.length = len(source)
         self.index = 0
         self.line = 1
-        self.column = 1
+        # Columns are derived from the offset of the current line's first
+        # character rather than tracked per character.
+        self.line_start = 0
+
+    @property
+    def column(self) -> int:
+        return self.index - self.line_start + 1
 
     def tokenize(self) -> list[Token]:
         tokens: list[Token] = []
-        while not self._at_end():
-            ch = self._peek()
-            if ch == "\ufeff":
-                self._advance()
-                continue
-            if ch in (" ", "\t", "\r"):
-                self._advance()
-                continue
-            if ch == "\n":
-                tokens.append(Token("NEWLINE", "\n", self.line, self.column))
-                self._advance()
-                continue
-            if ch == "#":
-                self._skip_comment()
-                continue
-            if ch == '"':
-                tokens.append(self._read_string())
-                continue
-            if ch.isdigit():
-                tokens.append(self._read_number())
-                continue
-            if ch.isalpha() or ch == "_":
-                tokens.append(self._read_identifier())
-                continue
-            if ch in SYMBOLS:
-                line, col = self.line, self.column
-                token_type = SYMBOLS[ch]
-                self._advance()
-                tokens.append(Token(token_type, ch, line, col))
-                continue
-            if ch in {"+", "-", "*", "/", "%"}:
-                line, col = self.line, self.column
-                self._advance()
-                tokens.append(Token("OP", ch, line, col))
+        append = tokens.append
+        source = self.source
+        length = self.length
+        match_token = _TOKEN_PATTERN.match
+        keyword_values = _KEYWORD_VALUES
+        index, line, line_start = self.index, self.line, self.line_start
+        while index < length:
+            match = match_token(source, index)
+            kind = match.lastindex
+            if kind is None:
+                # Trailing whitespace, or a token the pattern leaves to the
+                # readers.
+                index = match.end()
+                if index >= length:
+                    break
+                ch = source[index]
+                self.index, self.line, self.line_start = index, line, line_start
+                if ch == '"':
+                    append(self._read_string())
+                elif ch.isdigit():
+                    append(self._read_number())
+                elif ch.isalpha():
+                    append(self._read_identifier())
+                else:
+                    raise LexerError(
+                        f"Unexpected character {ch!r} at line {line}, column {index - line_start + 1}."
+                    )
+                index, line, line_start = self.index, self.line, self.line_start
                 continue
-            if ch in {"=", "!", "<", ">"}:
-                tokens.append(self._read_operator())
+            start = match.start(kind)
+            end = match.end()
+            column = start - line_start + 1
+            if kind == _IDENTIFIER:
+                value = match.group(kind)
+                # Already-lowercase words (most keywords as written) need no
+                # lower() copy.
+                keyword = keyword_values.get(value)
+                if keyword is None and not value.islower():
+                    keyword = keyword_values.get(value.lower())
+                if keyword is not None:
+                    append(Token("KEYWORD", keyword, line, column))
+                else:
+                    append(Token("IDENT", value, line, column))
+            elif kind == _SINGLE:
+                ch = source[start]
+                append(Token(_SINGLE_CHAR_TYPES[ch], ch, line, column))
+            elif kind == _NEWLINE:
+                append(Token("NEWLINE", "\n", line, column))
+                index = line_start = end
+                line += 1
                 continue
-            raise LexerError(f"Unexpected character {ch!r} at line {self.line}, column {self.column}.")
-        tokens.append(Token("EOF", "", self.line, self.column))
+            elif kind == _NUMBER:
+                if end < length and not source[end].isascii():
+                    # A Unicode digit may continue the number.
+                    self.index, self.line, self.line_start = start, line, line_start
+                    append(self._read_number())
+                    index = self.index
+                    continue
+                append(Token("NUMBER", match.group(kind), line, column))
+            elif kind == _STRING:
+                append(Token("STRING", source[start + 1 : end - 1], line, column))
+            elif kind == _RELATIONAL:
+                append(Token("OP", match.group(kind), line, column))
+            index = end
+        self.index, self.line, self.line_start = index, line, line_start
+        append(Token("EOF", "", line, index - line_start + 1))
         return tokens
 
-    def _read_operator(self) -> Token:
-        line, col = self.line, self.column
-        ch = self._advance()
-        if ch in {"=", "!", "<", ">"} and self._peek() == "=":
-            op = ch + self._advance()
-            return Token("OP", op, line, col)
-        return Token("OP", ch, line, col)
-
     def _read_identifier(self) -> Token:
-        line, col = self.line, self.column
-        chars = [self._advance()]
-        while not self._at_end():
-            ch = self._peek()
-            if ch.isalnum() or ch in {"_", "?"}:
-                chars.append(self._advance())
+        # Identifiers and numbers never span lines, so the scan only advances
+        # a local index.
+        source = self.source
+        length = self.length
+        start = self.index
+        index = start + 1
+        while index < length:
+            ch = source[index]
+            if ch in _IDENTIFIER_CHARS or ch.isalnum():
+                index += 1
             else:
                 break
-        value = "".join(chars)
-        lowered = value.lower()
-        if lowered in KEYWORDS:
-            return Token("KEYWORD", lowered, line, col)
+        value = source[start:index]
+        line, col = self.line, self.column
+        self.index = index
+        keyword = _KEYWORD_VALUES.get(value.lower())
+        if keyword is not None:
+            return Token("KEYWORD", keyword, line, col)
         return Token("IDENT", value, line, col)
 
     def _read_number(self) -> Token:
-        line, col = self.line, self.column
-        chars = [self._advance()]
+        source = self.source
+        length = self.length
+        start = self.index
+        index = start + 1
         seen_dot = False
-        while not self._at_end():
-            ch = self._peek()
+        while index < length:
+            ch = source[index]
             if ch.isdigit():
-                chars.append(self._advance())
+                index += 1
                 continue
             if ch == "." and not seen_dot:
                 seen_dot = True
-                chars.append(self._advance())
+                index += 1
                 continue
             break
-        return Token("NUMBER", "".join(chars), line, col)
+        line, col = self.line, self.column
+        self.index = index
+        return Token("NUMBER", source[start:index], line, col)
 
     def _read_string(self) -> Token:
         line, col = self.line, self.column
-        self._advance()  # opening quote
-        chars: list[str] = []
-        while not self._at_end():
-            ch = self._advance()
+        source = self.source
+        start = self.index
+        index = start + 1  # opening quote
+        parts: list[str] = []
+        newlines = 0
+        # Plain runs between quotes, escapes and newlines are copied as single
+        # slices; only escapes are handled one character at a time.
+        while True:
+            match = _STRING_STOP_PATTERN.search(source, index)
+            if match is None:
+                raise LexerError(f"Unterminated string literal at line {line}, column {col}.")
+            stop = match.start()
+            if stop > index:
+                parts.append(source[index:stop])
+            ch = source[stop]
             if ch == '"':
-                return Token("STRING", "".join(chars), line, col)
-            if ch == "\\":
-                if self._at_end():
-                    break
-                esc = self._advance()
-                escapes = {
-                    '"': '"',
-                    "\\": "\\",
-                    "n": "\n",
-                    "r": "\r",
-                    "t": "\t",
-                }
-                chars.append(escapes.get(esc, esc))
-                continue
+                index = stop + 1
+                break
             if ch == "\n":
                 raise LexerError(f"Unterminated string literal at line {line}, column {col}.")
-            chars.append(ch)
-        raise LexerError(f"Unterminated string literal at line {line}, column {col}.")
-
-    def _skip_comment(self) -> None:
-        while not self._at_end() and self._peek() != "\n":
-            self._advance()
-
-    def _peek(self) -> str:
-        if self._at_end():
-            return "\0"
-        return self.source[self.index]
-
-    def _advance(self) -> str:
-        ch = self.source[self.index]
-        self.index += 1
-        if ch == "\n":
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
-        return ch
-
-    def _at_end(self) -> bool:
-        return self.index >= self.length
+            if stop + 1 >= self.length:
+                raise LexerError(f"Unterminated string literal at line {line}, column {col}.")
+            esc = source[stop + 1]
+            if esc == "\n":
+                newlines += 1
+                self.line_start = stop + 2
+            parts.append(_ESCAPES.get(esc, esc))
+            index = stop + 2
+        self.index = index
+        self.line += newlines
+        return Token("STRING", "".join(parts), line, col)
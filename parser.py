@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
+from typing import Callable
 
 from lexer import Lexer, Token
 
@@ -9,296 +11,311 @@ class ParseError(ValueError):
     """Raised when parsing fails."""
 
 
-@dataclass
+# Lexer token types and keyword values are interned strings, so the hot token
+# checks below compare by identity; keyword arguments are always literals.
+_KEYWORD = sys.intern("KEYWORD")
+_EOF = sys.intern("EOF")
+_NEWLINE = sys.intern("NEWLINE")
+_RPAREN = sys.intern("RPAREN")
+_IDENT = sys.intern("IDENT")
+_STRING = sys.intern("STRING")
+_NUMBER = sys.intern("NUMBER")
+_OP = sys.intern("OP")
+_LPAREN = sys.intern("LPAREN")
+_LBRACKET = sys.intern("LBRACKET")
+_RBRACKET = sys.intern("RBRACKET")
+
+
+@dataclass(slots=True)
 class Node:
     line: int
     column: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Expr(Node):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class NumberExpr(Expr):
     value: float
 
 
-@dataclass
+@dataclass(slots=True)
 class StringExpr(Expr):
     value: str
 
 
-@dataclass
+@dataclass(slots=True)
 class VarExpr(Expr):
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class PickRandomExpr(Expr):
     start: Expr
     end: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class ListItemExpr(Expr):
     list_name: str
     index: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class ListLengthExpr(Expr):
     list_name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ListContainsExpr(Expr):
     list_name: str
     item: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class KeyPressedExpr(Expr):
     key: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class BuiltinReporterExpr(Expr):
     kind: str
 
 
-@dataclass
+@dataclass(slots=True)
 class UnaryExpr(Expr):
     op: str
     operand: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryExpr(Expr):
     op: str
     left: Expr
     right: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class Statement(Node):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class BroadcastStmt(Statement):
     message: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SetVarStmt(Statement):
     var_name: str
     value: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class ChangeVarStmt(Statement):
     var_name: str
     delta: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class MoveStmt(Statement):
     steps: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class SayStmt(Statement):
     message: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class ThinkStmt(Statement):
     message: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class WaitStmt(Statement):
     duration: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class RepeatStmt(Statement):
     times: Expr
     body: list[Statement] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ForeverStmt(Statement):
     body: list[Statement] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class IfStmt(Statement):
     condition: Expr
     then_body: list[Statement] = field(default_factory=list)
     else_body: list[Statement] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcedureCallStmt(Statement):
     name: str
     args: list[Expr] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class TurnRightStmt(Statement):
     degrees: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class TurnLeftStmt(Statement):
     degrees: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class GoToXYStmt(Statement):
     x: Expr
     y: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class ChangeXByStmt(Statement):
     value: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class SetXStmt(Statement):
     value: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class ChangeYByStmt(Statement):
     value: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class SetYStmt(Statement):
     value: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class PointInDirectionStmt(Statement):
     direction: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class IfOnEdgeBounceStmt(Statement):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class ChangeSizeByStmt(Statement):
     value: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class SetSizeToStmt(Statement):
     value: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class ShowStmt(Statement):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class HideStmt(Statement):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class NextCostumeStmt(Statement):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class NextBackdropStmt(Statement):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class StopStmt(Statement):
     option: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class AskStmt(Statement):
     question: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class ResetTimerStmt(Statement):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class AddToListStmt(Statement):
     list_name: str
     item: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class DeleteOfListStmt(Statement):
     list_name: str
     index: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class DeleteAllOfListStmt(Statement):
     list_name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class InsertAtListStmt(Statement):
     list_name: str
     item: Expr
     index: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class ReplaceItemOfListStmt(Statement):
     list_name: str
     index: Expr
     item: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class EventScript(Node):
     event_type: str
     message: str | None
     body: list[Statement] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Procedure(Node):
     name: str
     params: list[str] = field(default_factory=list)
     body: list[Statement] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class CostumeDecl(Node):
     path: str
 
 
-@dataclass
+@dataclass(slots=True)
 class VariableDecl(Node):
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ListDecl(Node):
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Target(Node):
     name: str
     is_stage: bool
@@ -309,28 +326,47 @@ class Target(Node):
     scripts: list[EventScript] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Project(Node):
     targets: list[Target] = field(default_factory=list)
 
 
+_EXPR_PRECEDENCE = {
+    "or": 1,
+    "and": 2,
+    "=": 3,
+    "==": 3,
+    "!=": 3,
+    "<": 3,
+    "<=": 3,
+    ">": 3,
+    ">=": 3,
+    "+": 4,
+    "-": 4,
+    "*": 5,
+    "/": 5,
+    "%": 5,
+}
+
+# Binary operator tokens keyed by (type, value), giving (operator, precedence).
+_BINARY_OPERATORS = {
+    ("KEYWORD" if op in ("and", "or") else "OP", op): (op, precedence)
+    for op, precedence in _EXPR_PRECEDENCE.items()
+}
+
+# Stop sets shared by every call instead of rebuilt as literals each time.
+_STOP_AT_RPAREN = frozenset({"RPAREN"})
+_STOP_AT_EOF = frozenset({"EOF"})
+_UNTIL_END = frozenset({"end"})
+_UNTIL_ELSE_OR_END = frozenset({"else", "end"})
+_UNTIL_SCRIPT_END = frozenset({"when", "define", "var", "list", "costume", "end"})
+_TARGET_KEYWORDS = frozenset({"sprite", "stage"})
+_KEY_PRESSED_WORDS = frozenset({"pressed", "pressed?"})
+
+
 class Parser:
-    _EXPR_PRECEDENCE = {
-        "or": 1,
-        "and": 2,
-        "=": 3,
-        "==": 3,
-        "!=": 3,
-        "<": 3,
-        "<=": 3,
-        ">": 3,
-        ">=": 3,
-        "+": 4,
-        "-": 4,
-        "*": 5,
-        "/": 5,
-        "%": 5,
-    }
+    tokens: list[Token]
+    index: int
 
     def __init__(self, tokens: list[Token]) -> None:
         self.tokens = tokens
@@ -343,10 +379,10 @@ class Parser:
 
     def parse_project(self) -> Project:
         self._skip_newlines()
-        line, col = self._current().line, self._current().column
+        start = self.tokens[self.index]
         targets: list[Target] = []
         while not self._at_end():
-            token = self._current()
+            token = self.tokens[self.index]
             if self._match_keyword("sprite"):
                 targets.append(self._parse_sprite(token.line, token.column))
             elif self._match_keyword("stage"):
@@ -356,7 +392,7 @@ class Parser:
             self._skip_newlines()
         if not targets:
             raise ParseError("Expected at least one 'stage' or 'sprite' block.")
-        return Project(line=line, column=col, targets=targets)
+        return Project(line=start.line, column=start.column, targets=targets)
 
     def _parse_sprite(self, line: int, col: int) -> Target:
         name = self._parse_sprite_name_token()
@@ -372,36 +408,42 @@ class Parser:
 
     def _parse_target_body(self, name: str, is_stage: bool, line: int, col: int) -> Target:
         target = Target(line=line, column=col, name=name, is_stage=is_stage)
+        tokens = self.tokens
         while True:
             self._skip_newlines()
-            if self._at_end():
+            token = tokens[self.index]
+            if token.type is _EOF:
                 self._error_here(f"Unterminated target block for '{name}'. Expected 'end'.")
-            if self._match_keyword("end"):
-                break
-            if self._match_keyword("var"):
-                var_line, var_col = self._previous().line, self._previous().column
-                var_name = self._parse_name_token()
-                target.variables.append(VariableDecl(line=var_line, column=var_col, name=var_name))
-                continue
-            if self._match_keyword("list"):
-                list_line, list_col = self._previous().line, self._previous().column
-                list_name = self._parse_name_token()
-                target.lists.append(ListDecl(line=list_line, column=list_col, name=list_name))
-                continue
-            if self._match_keyword("costume"):
-                costume_line, costume_col = self._previous().line, self._previous().column
-                path_token = self._consume_type("STRING", "Expected costume path string.")
-                target.costumes.append(CostumeDecl(line=costume_line, column=costume_col, path=path_token.value))
-                continue
-            if self._match_keyword("define"):
-                target.procedures.append(self._parse_procedure(self._previous().line, self._previous().column))
-                continue
-            if self._match_keyword("when"):
-                target.scripts.append(self._parse_event_script(self._previous().line, self._previous().column))
-                continue
+            if token.type is _KEYWORD:
+                if token.value == "end":
+                    self.index += 1
+                    break
+                parse_declaration = _TARGET_DECLARATION_PARSERS.get(token.value)
+                if parse_declaration is not None:
+                    self.index += 1
+                    parse_declaration(self, target, token)
+                    continue
             self._error_here("Expected 'var', 'list', 'costume', 'define', 'when', or 'end' inside target.")
         return target
 
+    def _parse_variable_decl(self, target: Target, start: Token) -> None:
+        var_name = self._parse_name_token()
+        target.variables.append(VariableDecl(line=start.line, column=start.column, name=var_name))
+
+    def _parse_list_decl(self, target: Target, start: Token) -> None:
+        list_name = self._parse_name_token()
+        target.lists.append(ListDecl(line=start.line, column=start.column, name=list_name))
+
+    def _parse_costume_decl(self, target: Target, start: Token) -> None:
+        path_token = self._consume_type("STRING", "Expected costume path string.")
+        target.costumes.append(CostumeDecl(line=start.line, column=start.column, path=path_token.value))
+
+    def _parse_procedure_decl(self, target: Target, start: Token) -> None:
+        target.procedures.append(self._parse_procedure(start.line, start.column))
+
+    def _parse_event_script_decl(self, target: Target, start: Token) -> None:
+        target.scripts.append(self._parse_event_script(start.line, start.column))
+
     def _parse_procedure(self, line: int, col: int) -> Procedure:
         name = self._parse_name_token()
         params: list[str] = []
@@ -413,7 +455,7 @@ class Parser:
             self._consume_type("RPAREN", "Expected ')' after parameter name.")
             params.append(param)
         self._skip_newlines()
-        body = self._parse_statement_block(until_keywords={"end"})
+        body = self._parse_statement_block(until_keywords=_UNTIL_END)
         self._consume_keyword("end", "Expected 'end' to close procedure definition.")
         return Procedure(line=line, column=col, name=name, params=params, body=body)
 
@@ -438,7 +480,7 @@ class Parser:
             raise AssertionError("unreachable")
         self._skip_newlines()
         body = self._parse_statement_block(
-            until_keywords={"when", "define", "var", "list", "costume", "end"},
+            until_keywords=_UNTIL_SCRIPT_END,
             consume_until=False,
         )
         # Allow optional explicit `end` after event scripts while preserving
@@ -449,77 +491,41 @@ class Parser:
 
     def _parse_statement_block(
         self,
-        until_keywords: set[str],
+        until_keywords: frozenset[str],
         consume_until: bool = False,
     ) -> list[Statement]:
         statements: list[Statement] = []
+        tokens = self.tokens
         while True:
-            self._skip_newlines()
-            if self._at_end():
+            token = tokens[self.index]
+            while token.type is _NEWLINE:
+                self.index += 1
+                token = tokens[self.index]
+            if token.type is _EOF:
                 break
-            token = self._current()
-            if token.type == "KEYWORD" and token.value in until_keywords:
+            if token.type is _KEYWORD and token.value in until_keywords:
                 if consume_until:
-                    self._advance()
+                    self.index += 1
                 break
             statements.append(self._parse_statement())
         return statements
 
     def _parse_statement(self) -> Statement:
-        token = self._current()
-        if self._check_keyword("broadcast"):
-            return self._parse_broadcast_stmt()
-        if self._check_keyword("set"):
-            return self._parse_set_stmt()
-        if self._check_keyword("change"):
-            return self._parse_change_stmt()
-        if self._check_keyword("move"):
-            return self._parse_move_stmt()
-        if self._check_keyword("say"):
-            return self._parse_say_stmt()
-        if self._check_keyword("think"):
-            return self._parse_think_stmt()
-        if self._check_keyword("repeat"):
-            return self._parse_repeat_stmt()
-        if self._check_keyword("forever"):
-            return self._parse_forever_stmt()
-        if self._check_keyword("if"):
-            if self._looks_like_if_on_edge_bounce():
-                return self._parse_if_on_edge_bounce_stmt()
-            return self._parse_if_stmt()
-        if self._check_keyword("turn"):
-            return self._parse_turn_stmt()
-        if self._check_keyword("go"):
-            return self._parse_go_stmt()
-        if self._check_keyword("point"):
-            return self._parse_point_stmt()
-        if self._check_keyword("show"):
-            return self._parse_show_stmt()
-        if self._check_keyword("hide"):
-            return self._parse_hide_stmt()
-        if self._check_keyword("next"):
-            return self._parse_next_stmt()
-        if self._check_keyword("wait"):
-            return self._parse_wait_stmt()
-        if self._check_keyword("stop"):
-            return self._parse_stop_stmt()
-        if self._check_keyword("ask"):
-            return self._parse_ask_stmt()
-        if self._check_keyword("reset"):
-            return self._parse_reset_stmt()
-        if self._check_keyword("add"):
-            return self._parse_add_to_list_stmt()
-        if self._check_keyword("delete"):
-            return self._parse_delete_list_stmt()
-        if self._check_keyword("insert"):
-            return self._parse_insert_list_stmt()
-        if self._check_keyword("replace"):
-            return self._parse_replace_list_stmt()
-        if token.type == "IDENT":
+        token = self.tokens[self.index]
+        if token.type is _KEYWORD:
+            parse_stmt = _STATEMENT_PARSERS.get(token.value)
+            if parse_stmt is not None:
+                return parse_stmt(self)
+        elif token.type is _IDENT:
             return self._parse_call_stmt()
         self._error_here("Unknown statement.")
         raise AssertionError("unreachable")
 
+    def _parse_if_or_bounce_stmt(self) -> Statement:
+        if self._looks_like_if_on_edge_bounce():
+            return self._parse_if_on_edge_bounce_stmt()
+        return self._parse_if_stmt()
+
     def _parse_broadcast_stmt(self) -> BroadcastStmt:
         start = self._consume_keyword("broadcast", "Expected 'broadcast'.")
         message = self._parse_bracket_text()
@@ -585,14 +591,14 @@ class Parser:
         start = self._consume_keyword("repeat", "Expected 'repeat'.")
         times = self._parse_wrapped_expression()
         self._skip_newlines()
-        body = self._parse_statement_block(until_keywords={"end"})
+        body = self._parse_statement_block(until_keywords=_UNTIL_END)
         self._consume_keyword("end", "Expected 'end' to close repeat block.")
         return RepeatStmt(line=start.line, column=start.column, times=times, body=body)
 
     def _parse_forever_stmt(self) -> ForeverStmt:
         start = self._consume_keyword("forever", "Expected 'forever'.")
         self._skip_newlines()
-        body = self._parse_statement_block(until_keywords={"end"})
+        body = self._parse_statement_block(until_keywords=_UNTIL_END)
         self._consume_keyword("end", "Expected 'end' to close forever block.")
         return ForeverStmt(line=start.line, column=start.column, body=body)
 
@@ -706,122 +712,150 @@ class Parser:
 
     def _parse_if_stmt(self) -> IfStmt:
         start = self._consume_keyword("if", "Expected 'if'.")
-        condition_tokens = self._collect_tokens_until_keyword("then")
-        if not condition_tokens:
+        condition_start = self.index
+        condition_end = self._find_condition_end("then")
+        if condition_end == condition_start:
             raise ParseError(f"Expected condition after 'if' at line {start.line}, column {start.column}.")
-        if condition_tokens[0].type == "OP" and condition_tokens[0].value == "<":
-            if not (condition_tokens[-1].type == "OP" and condition_tokens[-1].value == ">"):
+        first = self.tokens[condition_start]
+        if first.type is _OP and first.value == "<":
+            last = self.tokens[condition_end - 1]
+            if not (last.type is _OP and last.value == ">"):
                 raise ParseError(
                     f"Expected condition enclosed in '<...>' before 'then' at line {start.line}, column {start.column}."
                 )
-            condition_tokens = condition_tokens[1:-1]
-        condition = self._parse_expression_from_tokens(condition_tokens)
+            if condition_end - condition_start == 2:
+                raise ParseError(f"Expected condition after 'if' at line {start.line}, column {start.column}.")
+            condition = self._parse_expression_in_range(condition_start + 1, condition_end - 1)
+        else:
+            condition = self._parse_expression_in_range(condition_start, condition_end)
+        self.index = condition_end
         self._consume_keyword("then", "Expected 'then' in if statement.")
         self._skip_newlines()
-        then_body = self._parse_statement_block(until_keywords={"else", "end"})
-        else_body: list[Statement] = []
+        then_body = self._parse_statement_block(until_keywords=_UNTIL_ELSE_OR_END)
         if self._match_keyword("else"):
             self._skip_newlines()
-            else_body = self._parse_statement_block(until_keywords={"end"})
+            else_body = self._parse_statement_block(until_keywords=_UNTIL_END)
+        else:
+            else_body = []
         self._consume_keyword("end", "Expected 'end' to close if statement.")
         return IfStmt(line=start.line, column=start.column, condition=condition, then_body=then_body, else_body=else_body)
 
     def _parse_call_stmt(self) -> ProcedureCallStmt:
         name = self._consume_type("IDENT", "Expected procedure name.")
         args: list[Expr] = []
-        while self._check_type("LPAREN"):
+        while self.tokens[self.index].type is _LPAREN:
             args.append(self._parse_wrapped_expression())
         return ProcedureCallStmt(line=name.line, column=name.column, name=name.value, args=args)
 
     def _parse_wrapped_expression(self) -> Expr:
         self._consume_type("LPAREN", "Expected '('.")
-        expr = self._parse_expression(stop_types={"RPAREN"})
+        expr = self._parse_expression(stop_types=_STOP_AT_RPAREN)
         self._consume_type("RPAREN", "Expected ')' after expression.")
         return expr
 
-    def _parse_expression_from_tokens(self, tokens: list[Token]) -> Expr:
-        synthetic = tokens + [Token(type="EOF", value="", line=tokens[-1].line, column=tokens[-1].column)]
-        parser = Parser(synthetic)
-        expr = parser._parse_expression(stop_types={"EOF"})
-        parser._consume_type("EOF", "Unexpected trailing tokens in expression.")
+    def _parse_expression_in_range(self, start: int, end: int) -> Expr:
+        # Parses tokens[start:end] as one whole expression in place: the token
+        # at `end` stands in as EOF (positioned like the last expression token)
+        # until parsing finishes.
+        tokens = self.tokens
+        saved = tokens[end]
+        last = tokens[end - 1]
+        tokens[end] = Token(type="EOF", value="", line=last.line, column=last.column)
+        self.index = start
+        try:
+            expr = self._parse_expression(stop_types=_STOP_AT_EOF)
+            self._consume_type("EOF", "Unexpected trailing tokens in expression.")
+        finally:
+            tokens[end] = saved
         return expr
 
-    def _parse_expression(self, stop_types: set[str] | None = None, min_precedence: int = 1) -> Expr:
-        if stop_types is None:
-            stop_types = set()
+    def _parse_expression(self, stop_types: frozenset[str] = frozenset(), min_precedence: int = 1) -> Expr:
+        tokens = self.tokens
+        binary_operators = _BINARY_OPERATORS
         left = self._parse_unary(stop_types=stop_types)
+        token = tokens[self.index]
+        # Most expressions are a single operand closed by ')' or a stop token;
+        # those return before any operator stacks are set up.
+        if token.type is _RPAREN or token.type in stop_types:
+            return left
+        operator = binary_operators.get((token.type, token.value))
+        if operator is None or operator[1] < min_precedence:
+            return left
+        # Operator precedence parsing over explicit stacks: pending operators
+        # are folded as soon as one of lower or equal precedence follows, which
+        # keeps every level left-associative.
+        operands = [left]
+        pending: list[tuple[str, int, Token]] = []
         while True:
-            token = self._current()
-            if token.type in stop_types:
-                break
-            op = self._as_operator(token)
-            if op is None:
+            op, precedence = operator
+            self.index += 1
+            while pending and pending[-1][1] >= precedence:
+                pending_op, _, op_token = pending.pop()
+                right = operands.pop()
+                operands[-1] = BinaryExpr(
+                    line=op_token.line, column=op_token.column, op=pending_op, left=operands[-1], right=right
+                )
+            pending.append((op, precedence, token))
+            operands.append(self._parse_unary(stop_types=stop_types))
+            token = tokens[self.index]
+            if token.type is _RPAREN or token.type in stop_types:
                 break
-            precedence = self._EXPR_PRECEDENCE.get(op)
-            if precedence is None or precedence < min_precedence:
+            operator = binary_operators.get((token.type, token.value))
+            if operator is None or operator[1] < min_precedence:
                 break
-            self._advance()
-            right = self._parse_expression(stop_types=stop_types, min_precedence=precedence + 1)
-            left = BinaryExpr(line=token.line, column=token.column, op=op, left=left, right=right)
-        return left
-
-    def _parse_unary(self, stop_types: set[str]) -> Expr:
-        token = self._current()
-        if token.type == "OP" and token.value == "-":
-            self._advance()
-            operand = self._parse_unary(stop_types)
-            return UnaryExpr(line=token.line, column=token.column, op="-", operand=operand)
-        if token.type == "KEYWORD" and token.value == "not":
-            self._advance()
-            operand = self._parse_unary(stop_types)
-            return UnaryExpr(line=token.line, column=token.column, op="not", operand=operand)
-        return self._parse_primary(stop_types=stop_types)
+        while pending:
+            pending_op, _, op_token = pending.pop()
+            right = operands.pop()
+            operands[-1] = BinaryExpr(line=op_token.line, column=op_token.column, op=pending_op, left=operands[-1], right=right)
+        return operands[0]
+
+    def _parse_unary(self, stop_types: frozenset[str]) -> Expr:
+        tokens = self.tokens
+        token = tokens[self.index]
+        prefixes: list[Token] | None = None
+        while (token.type is _OP and token.value == "-") or (token.type is _KEYWORD and token.value == "not"):
+            if prefixes is None:
+                prefixes = []
+            prefixes.append(token)
+            self.index += 1
+            token = tokens[self.index]
+        expr = self._parse_primary(stop_types=stop_types)
+        if prefixes is not None:
+            # The last prefix read binds tightest, so wrap from the operand out.
+            for token in reversed(prefixes):
+                expr = UnaryExpr(line=token.line, column=token.column, op=token.value, operand=expr)
+        return expr
 
-    def _parse_primary(self, stop_types: set[str]) -> Expr:
-        token = self._current()
-        if token.type in stop_types:
+    def _parse_primary(self, stop_types: frozenset[str]) -> Expr:
+        token = self.tokens[self.index]
+        token_type = token.type
+        if token_type in stop_types:
             self._error_here("Expected expression.")
-        if self._check_keyword("pick"):
-            return self._parse_pick_random_expr()
-        if self._check_keyword("item"):
-            return self._parse_item_of_list_expr()
-        if self._check_keyword("length"):
-            return self._parse_length_expr()
-        if self._check_keyword("key"):
-            return self._parse_key_pressed_expr()
-        if self._check_keyword("answer"):
-            start = self._consume_keyword("answer", "Expected 'answer'.")
-            return BuiltinReporterExpr(line=start.line, column=start.column, kind="answer")
-        if self._check_keyword("mouse"):
-            start = self._consume_keyword("mouse", "Expected 'mouse'.")
-            if self._match_keyword("x"):
-                return BuiltinReporterExpr(line=start.line, column=start.column, kind="mouse_x")
-            if self._match_keyword("y"):
-                return BuiltinReporterExpr(line=start.line, column=start.column, kind="mouse_y")
-            self._error_here("Expected 'x' or 'y' after 'mouse'.")
-        if self._check_keyword("timer"):
-            start = self._consume_keyword("timer", "Expected 'timer'.")
-            return BuiltinReporterExpr(line=start.line, column=start.column, kind="timer")
-        if token.type == "NUMBER":
-            self._advance()
+        if token_type is _KEYWORD:
+            parse_reporter = _PRIMARY_PARSERS.get(token.value)
+            if parse_reporter is not None:
+                return parse_reporter(self)
+        if token_type is _NUMBER:
+            self.index += 1
             value = float(token.value)
             return NumberExpr(line=token.line, column=token.column, value=value)
-        if token.type == "STRING":
-            self._advance()
+        if token_type is _STRING:
+            self.index += 1
             return StringExpr(line=token.line, column=token.column, value=token.value)
-        if token.type == "IDENT":
-            if self._peek().type == "LPAREN":
+        if token_type is _IDENT:
+            # An identifier is never the final EOF, so the next token exists.
+            if self.tokens[self.index + 1].type is _LPAREN:
                 raise ParseError(
                     f"Procedure call '{token.value}' cannot appear inside an expression at line {token.line}, column {token.column}."
                 )
-            self._advance()
+            self.index += 1
             return VarExpr(line=token.line, column=token.column, name=token.value)
-        if token.type == "LPAREN":
-            self._advance()
-            expr = self._parse_expression(stop_types={"RPAREN"})
+        if token_type is _LPAREN:
+            self.index += 1
+            expr = self._parse_expression(stop_types=_STOP_AT_RPAREN)
             self._consume_type("RPAREN", "Expected ')' after grouped expression.")
             return expr
-        if token.type == "LBRACKET":
+        if token_type is _LBRACKET:
             name = self._parse_variable_field_name()
             if self._match_keyword("contains"):
                 item = self._parse_wrapped_expression()
@@ -830,6 +864,23 @@ class Parser:
         self._error_here("Expected expression.")
         raise AssertionError("unreachable")
 
+    def _parse_answer_expr(self) -> BuiltinReporterExpr:
+        start = self._consume_keyword("answer", "Expected 'answer'.")
+        return BuiltinReporterExpr(line=start.line, column=start.column, kind="answer")
+
+    def _parse_mouse_expr(self) -> BuiltinReporterExpr:
+        start = self._consume_keyword("mouse", "Expected 'mouse'.")
+        if self._match_keyword("x"):
+            return BuiltinReporterExpr(line=start.line, column=start.column, kind="mouse_x")
+        if self._match_keyword("y"):
+            return BuiltinReporterExpr(line=start.line, column=start.column, kind="mouse_y")
+        self._error_here("Expected 'x' or 'y' after 'mouse'.")
+        raise AssertionError("unreachable")
+
+    def _parse_timer_expr(self) -> BuiltinReporterExpr:
+        start = self._consume_keyword("timer", "Expected 'timer'.")
+        return BuiltinReporterExpr(line=start.line, column=start.column, kind="timer")
+
     def _parse_pick_random_expr(self) -> PickRandomExpr:
         start = self._consume_keyword("pick", "Expected 'pick'.")
         self._consume_keyword("random", "Expected 'random' after 'pick'.")
@@ -858,93 +909,97 @@ class Parser:
         start = self._consume_keyword("key", "Expected 'key'.")
         key_expr = self._parse_wrapped_expression()
         word = self._current_word()
-        if word in {"pressed", "pressed?"}:
+        if word in _KEY_PRESSED_WORDS:
             self._advance()
         else:
             self._error_here("Expected 'pressed?' in key sensing expression.")
         return KeyPressedExpr(line=start.line, column=start.column, key=key_expr)
 
     def _parse_variable_field_name(self) -> str:
-        contents = self._parse_bracket_tokens()
-        if not contents:
+        parts = self._parse_bracket_values()
+        if not parts:
             self._error_here("Variable name cannot be empty.")
-        parts = [t.value for t in contents]
         if parts[0].lower() == "var":
             parts = parts[1:]
         name = " ".join(parts).strip()
         if not name:
             self._error_here("Variable name cannot be empty.")
-        return name
+        # Field names repeat across a project; interning keeps one copy of each
+        # and lets the name-keyed lookups downstream hit on identity.
+        return sys.intern(name)
 
     def _parse_list_field_name(self) -> str:
-        contents = self._parse_bracket_tokens()
-        if not contents:
+        parts = self._parse_bracket_values()
+        if not parts:
             self._error_here("List name cannot be empty.")
-        name = " ".join(t.value for t in contents).strip()
+        name = " ".join(parts).strip()
         if not name:
             self._error_here("List name cannot be empty.")
-        return name
+        return sys.intern(name)
 
     def _parse_bracket_text(self) -> str:
-        contents = self._parse_bracket_tokens()
-        return " ".join(token.value for token in contents).strip()
+        return " ".join(self._parse_bracket_values()).strip()
 
-    def _parse_bracket_tokens(self) -> list[Token]:
+    def _parse_bracket_values(self) -> list[str]:
         self._consume_type("LBRACKET", "Expected '['.")
-        tokens: list[Token] = []
-        while not self._at_end() and not self._check_type("RBRACKET"):
-            if self._check_type("NEWLINE"):
+        tokens = self.tokens
+        index = self.index
+        values: list[str] = []
+        token = tokens[index]
+        while token.type is not _RBRACKET and token.type is not _EOF:
+            if token.type is _NEWLINE:
+                self.index = index
                 self._error_here("Unexpected newline in bracket expression.")
-            tokens.append(self._advance())
+            values.append(token.value)
+            index += 1
+            token = tokens[index]
+        self.index = index
         self._consume_type("RBRACKET", "Expected ']'.")
-        return tokens
+        return values
 
-    def _collect_tokens_until_keyword(self, keyword: str) -> list[Token]:
-        out: list[Token] = []
+    def _find_condition_end(self, keyword: str) -> int:
+        # Returns the index of the first `keyword` outside any parentheses or
+        # brackets (or of EOF), leaving the parser positioned there.
+        tokens = self.tokens
+        index = self.index
         depth_paren = 0
         depth_bracket = 0
-        while not self._at_end():
-            token = self._current()
-            if token.type == "KEYWORD" and token.value == keyword and depth_paren == 0 and depth_bracket == 0:
+        while True:
+            token = tokens[index]
+            token_type = token.type
+            if token_type is _EOF:
+                break
+            if token_type is _KEYWORD and token.value is keyword and depth_paren == 0 and depth_bracket == 0:
                 break
-            if token.type == "LPAREN":
+            if token_type is _LPAREN:
                 depth_paren += 1
-            elif token.type == "RPAREN":
+            elif token_type is _RPAREN:
                 depth_paren -= 1
-            elif token.type == "LBRACKET":
+            elif token_type is _LBRACKET:
                 depth_bracket += 1
-            elif token.type == "RBRACKET":
+            elif token_type is _RBRACKET:
                 depth_bracket -= 1
-            out.append(self._advance())
+            index += 1
+        self.index = index
         if depth_paren != 0 or depth_bracket != 0:
             self._error_here("Unbalanced delimiters while reading condition.")
-        return out
+        return index
 
     def _parse_name_token(self) -> str:
-        token = self._current()
-        if token.type == "IDENT":
-            self._advance()
-            return token.value
-        if token.type == "STRING":
-            self._advance()
+        token = self.tokens[self.index]
+        if token.type is _IDENT or token.type is _STRING:
+            self.index += 1
             return token.value
         self._error_here("Expected name.")
         raise AssertionError("unreachable")
 
     def _parse_sprite_name_token(self) -> str:
-        token = self._current()
-        if token.type == "KEYWORD" and token.value == "stage":
-            self._advance()
+        token = self.tokens[self.index]
+        if token.type is _KEYWORD and token.value == "stage":
+            self.index += 1
             return "Stage"
         return self._parse_name_token()
 
-    def _as_operator(self, token: Token) -> str | None:
-        if token.type == "OP":
-            return token.value
-        if token.type == "KEYWORD" and token.value in {"and", "or"}:
-            return token.value
-        return None
-
     def _looks_like_if_on_edge_bounce(self) -> bool:
         return (
             self._word_at_offset(0) == "if"
@@ -963,73 +1018,72 @@ class Parser:
         return self._word_from_token(self.tokens[idx])
 
     def _word_from_token(self, token: Token) -> str | None:
-        if token.type == "KEYWORD":
+        if token.type is _KEYWORD:
             return token.value
-        if token.type == "IDENT":
+        if token.type is _IDENT:
             return token.value.lower()
         return None
 
     def _check_keyword(self, value: str) -> bool:
-        token = self._current()
-        return token.type == "KEYWORD" and token.value == value
+        token = self.tokens[self.index]
+        return token.type is _KEYWORD and token.value is value
 
     def _looks_like_event_end(self) -> bool:
         # If the next significant token starts a new top-level target or EOF,
         # treat current `end` as target terminator, not event terminator.
+        tokens = self.tokens
         idx = self.index + 1
-        while idx < len(self.tokens) and self.tokens[idx].type == "NEWLINE":
+        while idx < len(tokens) and tokens[idx].type is _NEWLINE:
             idx += 1
-        if idx >= len(self.tokens):
+        if idx >= len(tokens):
             return False
-        token = self.tokens[idx]
-        if token.type == "EOF":
+        token = tokens[idx]
+        if token.type is _EOF:
             return False
-        if token.type == "KEYWORD" and token.value in {"sprite", "stage"}:
+        if token.type is _KEYWORD and token.value in _TARGET_KEYWORDS:
             return False
         return True
 
     def _consume_keyword(self, value: str, message: str) -> Token:
-        token = self._current()
-        if token.type == "KEYWORD" and token.value == value:
-            self._advance()
+        token = self.tokens[self.index]
+        if token.type is _KEYWORD and token.value is value:
+            self.index += 1
             return token
         raise ParseError(f"{message} (line {token.line}, column {token.column})")
 
     def _consume_type(self, token_type: str, message: str) -> Token:
-        token = self._current()
-        if token.type == token_type:
-            self._advance()
+        token = self.tokens[self.index]
+        if token.type is token_type:
+            self.index += 1
             return token
         raise ParseError(f"{message} (line {token.line}, column {token.column})")
 
-    def _match_keyword(self, value: str) -> bool:
-        token = self._current()
-        if token.type == "KEYWORD" and token.value == value:
-            self._advance()
-            return True
-        return False
+    def _match_keyword(self, value: str) -> Token | None:
+        # Returns the consumed keyword token, so callers needing its position
+        # don't have to look back for it.
+        token = self.tokens[self.index]
+        if token.type is _KEYWORD and token.value is value:
+            self.index += 1
+            return token
+        return None
 
     def _check_type(self, token_type: str) -> bool:
-        return self._current().type == token_type
+        return self.tokens[self.index].type is token_type
 
     def _skip_newlines(self) -> None:
-        while self._check_type("NEWLINE"):
-            self._advance()
+        tokens = self.tokens
+        index = self.index
+        # The stream always ends in EOF, so the scan needs no bounds check.
+        while tokens[index].type is _NEWLINE:
+            index += 1
+        self.index = index
 
     def _at_end(self) -> bool:
-        return self._current().type == "EOF"
+        return self.tokens[self.index].type is _EOF
 
     def _current(self) -> Token:
         return self.tokens[self.index]
 
-    def _peek(self) -> Token:
-        if self.index + 1 >= len(self.tokens):
-            return self.tokens[-1]
-        return self.tokens[self.index + 1]
-
-    def _previous(self) -> Token:
-        return self.tokens[self.index - 1]
-
     def _advance(self) -> Token:
         token = self.tokens[self.index]
         self.index += 1
@@ -1038,3 +1092,52 @@ class Parser:
     def _error_here(self, message: str) -> None:
         token = self._current()
         raise ParseError(f"{message} (line {token.line}, column {token.column})")
+
+
+# Target body declarations keyed by their leading keyword; each is called with
+# that keyword already consumed.
+_TARGET_DECLARATION_PARSERS: dict[str, Callable[[Parser, Target, Token], None]] = {
+    "var": Parser._parse_variable_decl,
+    "list": Parser._parse_list_decl,
+    "costume": Parser._parse_costume_decl,
+    "define": Parser._parse_procedure_decl,
+    "when": Parser._parse_event_script_decl,
+}
+
+# Statement parsers keyed by their leading keyword.
+_STATEMENT_PARSERS: dict[str, Callable[[Parser], Statement]] = {
+    "broadcast": Parser._parse_broadcast_stmt,
+    "set": Parser._parse_set_stmt,
+    "change": Parser._parse_change_stmt,
+    "move": Parser._parse_move_stmt,
+    "say": Parser._parse_say_stmt,
+    "think": Parser._parse_think_stmt,
+    "repeat": Parser._parse_repeat_stmt,
+    "forever": Parser._parse_forever_stmt,
+    "if": Parser._parse_if_or_bounce_stmt,
+    "turn": Parser._parse_turn_stmt,
+    "go": Parser._parse_go_stmt,
+    "point": Parser._parse_point_stmt,
+    "show": Parser._parse_show_stmt,
+    "hide": Parser._parse_hide_stmt,
+    "next": Parser._parse_next_stmt,
+    "wait": Parser._parse_wait_stmt,
+    "stop": Parser._parse_stop_stmt,
+    "ask": Parser._parse_ask_stmt,
+    "reset": Parser._parse_reset_stmt,
+    "add": Parser._parse_add_to_list_stmt,
+    "delete": Parser._parse_delete_list_stmt,
+    "insert": Parser._parse_insert_list_stmt,
+    "replace": Parser._parse_replace_list_stmt,
+}
+
+# Expression reporters keyed by their leading keyword.
+_PRIMARY_PARSERS: dict[str, Callable[[Parser], Expr]] = {
+    "pick": Parser._parse_pick_random_expr,
+    "item": Parser._parse_item_of_list_expr,
+    "length": Parser._parse_length_expr,
+    "key": Parser._parse_key_pressed_expr,
+    "answer": Parser._parse_answer_expr,
+    "mouse": Parser._parse_mouse_expr,
+    "timer": Parser._parse_timer_expr,
+}
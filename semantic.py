@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Any, Callable
 
 from parser import (
     AddToListStmt,
     BinaryExpr,
-    BuiltinReporterExpr,
     ChangeSizeByStmt,
     ChangeXByStmt,
     ChangeYByStmt,
@@ -28,6 +28,7 @@ from parser import (
     MoveStmt,
     NextBackdropStmt,
     NextCostumeStmt,
+    NumberExpr,
     PickRandomExpr,
     PointInDirectionStmt,
     Procedure,
@@ -44,6 +45,7 @@ from parser import (
     ShowStmt,
     Statement,
     StopStmt,
+    StringExpr,
     Target,
     ThinkStmt,
     TurnLeftStmt,
@@ -59,19 +61,36 @@ class SemanticError(ValueError):
     """Raised when semantic validation fails."""
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcedureInfo:
     name: str
     line: int
     params: list[str]
+    param_scope: frozenset[str]
+
+
+@dataclass(frozen=True, slots=True)
+class _AnalysisContext:
+    target: Target
+    variables: dict[str, int]
+    lists: dict[str, int]
+    procedures: dict[str, ProcedureInfo]
+    param_scope: frozenset[str]
+    scope_name: str
+
+
+_NO_PARAMS: frozenset[str] = frozenset()
 
 
 def analyze(project: Project) -> None:
     if not project.targets:
         raise SemanticError("Project must define at least one target.")
-    stage_count = sum(1 for target in project.targets if target.is_stage)
-    if stage_count > 1:
-        raise SemanticError("Project can only define one stage.")
+    has_stage = False
+    for target in project.targets:
+        if target.is_stage:
+            if has_stage:
+                raise SemanticError("Project can only define one stage.")
+            has_stage = True
     names = set()
     for target in project.targets:
         lowered = target.name.lower()
@@ -108,24 +127,25 @@ def _analyze_target(target: Target) -> None:
             raise SemanticError(
                 f"Procedure '{procedure.name}' is already defined at line {prev.line} in target '{target.name}'."
             )
-        if len(set(p.lower() for p in procedure.params)) != len(procedure.params):
+        param_scope = frozenset(p.lower() for p in procedure.params)
+        if len(param_scope) != len(procedure.params):
             raise SemanticError(
                 f"Procedure '{procedure.name}' has duplicate parameter names at line {procedure.line}, column {procedure.column}."
             )
-        procedures[lowered] = ProcedureInfo(name=procedure.name, line=procedure.line, params=procedure.params)
+        procedures[lowered] = ProcedureInfo(
+            name=procedure.name, line=procedure.line, params=procedure.params, param_scope=param_scope
+        )
 
     for procedure in target.procedures:
-        params = {name.lower() for name in procedure.params}
-        _analyze_statements(
+        context = _AnalysisContext(
             target=target,
-            statements=procedure.body,
             variables=variables,
             lists=lists,
             procedures=procedures,
-            param_scope=params,
-            current_line=procedure.line,
+            param_scope=procedures[procedure.name.lower()].param_scope,
             scope_name=f"procedure '{procedure.name}'",
         )
+        _analyze_statements(procedure.body, context)
 
     for script in target.scripts:
         _analyze_event_script(
@@ -144,199 +164,246 @@ def _analyze_event_script(
     lists: dict[str, int],
     procedures: dict[str, ProcedureInfo],
 ) -> None:
-    _analyze_statements(
+    context = _AnalysisContext(
         target=target,
-        statements=script.body,
         variables=variables,
         lists=lists,
         procedures=procedures,
-        param_scope=set(),
-        current_line=script.line,
+        param_scope=_NO_PARAMS,
         scope_name=f"event script '{script.event_type}'",
     )
+    _analyze_statements(script.body, context)
 
 
-def _analyze_statements(
-    target: Target,
-    statements: list[Statement],
-    variables: dict[str, int],
-    lists: dict[str, int],
-    procedures: dict[str, ProcedureInfo],
-    param_scope: set[str],
-    current_line: int,
-    scope_name: str,
-) -> None:
-    for stmt in statements:
-        if isinstance(stmt, BroadcastStmt):
-            if not stmt.message:
-                raise SemanticError(
-                    f"Broadcast message cannot be empty at line {stmt.line}, column {stmt.column} in target '{target.name}'."
-                )
-        elif isinstance(stmt, SetVarStmt):
-            _ensure_variable_exists(target, stmt.var_name, variables, param_scope, stmt.line, stmt.column)
-            _analyze_expr(target, stmt.value, variables, lists, param_scope)
-        elif isinstance(stmt, ChangeVarStmt):
-            _ensure_variable_exists(target, stmt.var_name, variables, param_scope, stmt.line, stmt.column)
-            _analyze_expr(target, stmt.delta, variables, lists, param_scope)
-        elif isinstance(stmt, (MoveStmt, SayStmt, ThinkStmt, WaitStmt)):
-            expr = stmt.steps if isinstance(stmt, MoveStmt) else stmt.message if isinstance(stmt, (SayStmt, ThinkStmt)) else stmt.duration
-            _analyze_expr(target, expr, variables, lists, param_scope)
-        elif isinstance(stmt, (TurnRightStmt, TurnLeftStmt)):
-            _analyze_expr(target, stmt.degrees, variables, lists, param_scope)
-        elif isinstance(stmt, GoToXYStmt):
-            _analyze_expr(target, stmt.x, variables, lists, param_scope)
-            _analyze_expr(target, stmt.y, variables, lists, param_scope)
-        elif isinstance(stmt, (ChangeXByStmt, ChangeYByStmt, SetXStmt, SetYStmt, PointInDirectionStmt, ChangeSizeByStmt, SetSizeToStmt)):
-            expr = getattr(stmt, "value", None) or getattr(stmt, "direction", None)
-            _analyze_expr(target, expr, variables, lists, param_scope)
-        elif isinstance(stmt, (IfOnEdgeBounceStmt, ShowStmt, HideStmt, NextCostumeStmt, NextBackdropStmt, ResetTimerStmt)):
-            pass
-        elif isinstance(stmt, StopStmt):
-            _analyze_expr(target, stmt.option, variables, lists, param_scope)
-        elif isinstance(stmt, AskStmt):
-            _analyze_expr(target, stmt.question, variables, lists, param_scope)
-        elif isinstance(stmt, AddToListStmt):
-            _ensure_list_exists(target, stmt.list_name, lists, stmt.line, stmt.column)
-            _analyze_expr(target, stmt.item, variables, lists, param_scope)
-        elif isinstance(stmt, DeleteOfListStmt):
-            _ensure_list_exists(target, stmt.list_name, lists, stmt.line, stmt.column)
-            _analyze_expr(target, stmt.index, variables, lists, param_scope)
-        elif isinstance(stmt, DeleteAllOfListStmt):
-            _ensure_list_exists(target, stmt.list_name, lists, stmt.line, stmt.column)
-        elif isinstance(stmt, InsertAtListStmt):
-            _ensure_list_exists(target, stmt.list_name, lists, stmt.line, stmt.column)
-            _analyze_expr(target, stmt.item, variables, lists, param_scope)
-            _analyze_expr(target, stmt.index, variables, lists, param_scope)
-        elif isinstance(stmt, ReplaceItemOfListStmt):
-            _ensure_list_exists(target, stmt.list_name, lists, stmt.line, stmt.column)
-            _analyze_expr(target, stmt.index, variables, lists, param_scope)
-            _analyze_expr(target, stmt.item, variables, lists, param_scope)
-        elif isinstance(stmt, RepeatStmt):
-            _analyze_expr(target, stmt.times, variables, lists, param_scope)
-            _analyze_statements(
-                target=target,
-                statements=stmt.body,
-                variables=variables,
-                lists=lists,
-                procedures=procedures,
-                param_scope=param_scope,
-                current_line=current_line,
-                scope_name=scope_name,
-            )
-        elif isinstance(stmt, ForeverStmt):
-            _analyze_statements(
-                target=target,
-                statements=stmt.body,
-                variables=variables,
-                lists=lists,
-                procedures=procedures,
-                param_scope=param_scope,
-                current_line=current_line,
-                scope_name=scope_name,
-            )
-        elif isinstance(stmt, IfStmt):
-            _analyze_expr(target, stmt.condition, variables, lists, param_scope)
-            _analyze_statements(
-                target=target,
-                statements=stmt.then_body,
-                variables=variables,
-                lists=lists,
-                procedures=procedures,
-                param_scope=param_scope,
-                current_line=current_line,
-                scope_name=scope_name,
-            )
-            _analyze_statements(
-                target=target,
-                statements=stmt.else_body,
-                variables=variables,
-                lists=lists,
-                procedures=procedures,
-                param_scope=param_scope,
-                current_line=current_line,
-                scope_name=scope_name,
-            )
-        elif isinstance(stmt, ProcedureCallStmt):
-            proc = procedures.get(stmt.name.lower())
-            if proc is None:
-                raise SemanticError(
-                    f"Unknown procedure '{stmt.name}' at line {stmt.line}, column {stmt.column} in target '{target.name}'."
-                )
-            if stmt.line < proc.line:
-                raise SemanticError(
-                    f"Procedure '{stmt.name}' is used before it is defined (call line {stmt.line}, definition line {proc.line}) "
-                    f"in target '{target.name}'."
-                )
-            if len(stmt.args) != len(proc.params):
-                raise SemanticError(
-                    f"Procedure '{stmt.name}' expects {len(proc.params)} argument(s), got {len(stmt.args)} at line {stmt.line}, "
-                    f"column {stmt.column} in {scope_name}."
-                )
-            for expr in stmt.args:
-                _analyze_expr(target, expr, variables, lists, param_scope)
-        else:
+def _analyze_statements(statements: list[Statement], context: _AnalysisContext) -> None:
+    # One explicit stack in source order: nested bodies are pushed reversed so
+    # they are checked before the statements that follow their block.
+    pending = statements[::-1]
+    while pending:
+        stmt = pending.pop()
+        stmt_type = type(stmt)
+        analyze_stmt = _STATEMENT_ANALYZERS.get(stmt_type)
+        if analyze_stmt is None:
             raise SemanticError(
-                f"Unsupported statement type '{type(stmt).__name__}' at line {stmt.line}, column {stmt.column} in target '{target.name}'."
+                f"Unsupported statement type '{stmt_type.__name__}' at line {stmt.line}, column {stmt.column} in target '{context.target.name}'."
             )
+        analyze_stmt(stmt, context)
+        if stmt_type is RepeatStmt or stmt_type is ForeverStmt:
+            pending.extend(reversed(stmt.body))
+        elif stmt_type is IfStmt:
+            pending.extend(reversed(stmt.else_body))
+            pending.extend(reversed(stmt.then_body))
 
 
-def _analyze_expr(target: Target, expr: Expr, variables: dict[str, int], lists: dict[str, int], param_scope: set[str]) -> None:
-    if isinstance(expr, VarExpr):
-        lowered = expr.name.lower()
-        if lowered in param_scope:
-            return
-        if lowered not in variables:
-            raise SemanticError(
-                f"Unknown variable '{expr.name}' at line {expr.line}, column {expr.column} in target '{target.name}'."
-            )
-        return
-    if isinstance(expr, UnaryExpr):
-        _analyze_expr(target, expr.operand, variables, lists, param_scope)
-        return
-    if isinstance(expr, BinaryExpr):
-        _analyze_expr(target, expr.left, variables, lists, param_scope)
-        _analyze_expr(target, expr.right, variables, lists, param_scope)
-        return
-    if isinstance(expr, PickRandomExpr):
-        _analyze_expr(target, expr.start, variables, lists, param_scope)
-        _analyze_expr(target, expr.end, variables, lists, param_scope)
-        return
-    if isinstance(expr, ListItemExpr):
-        _ensure_list_exists(target, expr.list_name, lists, expr.line, expr.column)
-        _analyze_expr(target, expr.index, variables, lists, param_scope)
-        return
-    if isinstance(expr, ListLengthExpr):
-        _ensure_list_exists(target, expr.list_name, lists, expr.line, expr.column)
-        return
-    if isinstance(expr, ListContainsExpr):
-        _ensure_list_exists(target, expr.list_name, lists, expr.line, expr.column)
-        _analyze_expr(target, expr.item, variables, lists, param_scope)
-        return
-    if isinstance(expr, KeyPressedExpr):
-        _analyze_expr(target, expr.key, variables, lists, param_scope)
-        return
-    if isinstance(expr, BuiltinReporterExpr):
-        return
-
-
-def _ensure_variable_exists(
-    target: Target,
-    name: str,
-    variables: dict[str, int],
-    param_scope: set[str],
-    line: int,
-    column: int,
+def _analyze_broadcast_stmt(stmt: BroadcastStmt, context: _AnalysisContext) -> None:
+    if not stmt.message:
+        raise SemanticError(
+            f"Broadcast message cannot be empty at line {stmt.line}, column {stmt.column} in target '{context.target.name}'."
+        )
+
+
+def _analyze_set_var_stmt(stmt: SetVarStmt, context: _AnalysisContext) -> None:
+    _ensure_variable_exists(stmt.var_name, stmt.line, stmt.column, context)
+    _analyze_exprs(context, stmt.value)
+
+
+def _analyze_change_var_stmt(stmt: ChangeVarStmt, context: _AnalysisContext) -> None:
+    _ensure_variable_exists(stmt.var_name, stmt.line, stmt.column, context)
+    _analyze_exprs(context, stmt.delta)
+
+
+def _analyze_move_stmt(stmt: MoveStmt, context: _AnalysisContext) -> None:
+    _analyze_exprs(context, stmt.steps)
+
+
+def _analyze_message_stmt(stmt: SayStmt | ThinkStmt, context: _AnalysisContext) -> None:
+    _analyze_exprs(context, stmt.message)
+
+
+def _analyze_wait_stmt(stmt: WaitStmt, context: _AnalysisContext) -> None:
+    _analyze_exprs(context, stmt.duration)
+
+
+def _analyze_turn_stmt(stmt: TurnRightStmt | TurnLeftStmt, context: _AnalysisContext) -> None:
+    _analyze_exprs(context, stmt.degrees)
+
+
+def _analyze_go_to_xy_stmt(stmt: GoToXYStmt, context: _AnalysisContext) -> None:
+    _analyze_exprs(context, stmt.x, stmt.y)
+
+
+def _analyze_value_stmt(
+    stmt: ChangeXByStmt | ChangeYByStmt | SetXStmt | SetYStmt | ChangeSizeByStmt | SetSizeToStmt,
+    context: _AnalysisContext,
 ) -> None:
+    _analyze_exprs(context, stmt.value)
+
+
+def _analyze_point_in_direction_stmt(stmt: PointInDirectionStmt, context: _AnalysisContext) -> None:
+    _analyze_exprs(context, stmt.direction)
+
+
+def _analyze_no_input_stmt(stmt: Statement, context: _AnalysisContext) -> None:
+    pass
+
+
+def _analyze_stop_stmt(stmt: StopStmt, context: _AnalysisContext) -> None:
+    _analyze_exprs(context, stmt.option)
+
+
+def _analyze_ask_stmt(stmt: AskStmt, context: _AnalysisContext) -> None:
+    _analyze_exprs(context, stmt.question)
+
+
+def _analyze_add_to_list_stmt(stmt: AddToListStmt, context: _AnalysisContext) -> None:
+    _ensure_list_exists(stmt.list_name, stmt.line, stmt.column, context)
+    _analyze_exprs(context, stmt.item)
+
+
+def _analyze_delete_of_list_stmt(stmt: DeleteOfListStmt, context: _AnalysisContext) -> None:
+    _ensure_list_exists(stmt.list_name, stmt.line, stmt.column, context)
+    _analyze_exprs(context, stmt.index)
+
+
+def _analyze_delete_all_of_list_stmt(stmt: DeleteAllOfListStmt, context: _AnalysisContext) -> None:
+    _ensure_list_exists(stmt.list_name, stmt.line, stmt.column, context)
+
+
+def _analyze_insert_at_list_stmt(stmt: InsertAtListStmt, context: _AnalysisContext) -> None:
+    _ensure_list_exists(stmt.list_name, stmt.line, stmt.column, context)
+    _analyze_exprs(context, stmt.item, stmt.index)
+
+
+def _analyze_replace_item_of_list_stmt(stmt: ReplaceItemOfListStmt, context: _AnalysisContext) -> None:
+    _ensure_list_exists(stmt.list_name, stmt.line, stmt.column, context)
+    _analyze_exprs(context, stmt.index, stmt.item)
+
+
+def _analyze_repeat_stmt(stmt: RepeatStmt, context: _AnalysisContext) -> None:
+    _analyze_exprs(context, stmt.times)
+
+
+def _analyze_if_stmt(stmt: IfStmt, context: _AnalysisContext) -> None:
+    _analyze_exprs(context, stmt.condition)
+
+
+def _analyze_procedure_call_stmt(stmt: ProcedureCallStmt, context: _AnalysisContext) -> None:
+    target = context.target
+    procedures = context.procedures
+    proc = procedures.get(stmt.name)
+    if proc is None:
+        proc = procedures.get(stmt.name.lower())
+    if proc is None:
+        raise SemanticError(
+            f"Unknown procedure '{stmt.name}' at line {stmt.line}, column {stmt.column} in target '{target.name}'."
+        )
+    if stmt.line < proc.line:
+        raise SemanticError(
+            f"Procedure '{stmt.name}' is used before it is defined (call line {stmt.line}, definition line {proc.line}) "
+            f"in target '{target.name}'."
+        )
+    if len(stmt.args) != len(proc.params):
+        raise SemanticError(
+            f"Procedure '{stmt.name}' expects {len(proc.params)} argument(s), got {len(stmt.args)} at line {stmt.line}, "
+            f"column {stmt.column} in {context.scope_name}."
+        )
+    _analyze_exprs(context, *stmt.args)
+
+
+def _analyze_exprs(context: _AnalysisContext, *exprs: Expr) -> None:
+    param_scope = context.param_scope
+    variables = context.variables
+    # All of a statement's inputs share one explicit stack; inputs and operands
+    # are pushed right to left so errors still surface in source order.
+    pending = list(reversed(exprs))
+    while pending:
+        expr = pending.pop()
+        expr_type = type(expr)
+        if expr_type is VarExpr:
+            # The scopes are keyed by lowered names and lower() is idempotent,
+            # so a name found as written needs no lowering.
+            name = expr.name
+            if name in param_scope or name in variables:
+                continue
+            lowered = name.lower()
+            if lowered in param_scope:
+                continue
+            if lowered not in variables:
+                raise SemanticError(
+                    f"Unknown variable '{expr.name}' at line {expr.line}, column {expr.column} in target '{context.target.name}'."
+                )
+        elif expr_type is NumberExpr or expr_type is StringExpr:
+            continue
+        elif expr_type is BinaryExpr:
+            pending.append(expr.right)
+            pending.append(expr.left)
+        elif expr_type is UnaryExpr:
+            pending.append(expr.operand)
+        elif expr_type is PickRandomExpr:
+            pending.append(expr.end)
+            pending.append(expr.start)
+        elif expr_type is ListItemExpr:
+            _ensure_list_exists(expr.list_name, expr.line, expr.column, context)
+            pending.append(expr.index)
+        elif expr_type is ListLengthExpr:
+            _ensure_list_exists(expr.list_name, expr.line, expr.column, context)
+        elif expr_type is ListContainsExpr:
+            _ensure_list_exists(expr.list_name, expr.line, expr.column, context)
+            pending.append(expr.item)
+        elif expr_type is KeyPressedExpr:
+            pending.append(expr.key)
+
+
+def _ensure_variable_exists(name: str, line: int, column: int, context: _AnalysisContext) -> None:
     lowered = name.lower()
-    if lowered in param_scope:
+    if lowered in context.param_scope:
         raise SemanticError(
             f"Variable field '{name}' refers to a procedure parameter at line {line}, column {column}; "
             "Scratch variable blocks must target declared variables."
         )
-    if lowered not in variables:
-        raise SemanticError(f"Unknown variable '{name}' at line {line}, column {column} in target '{target.name}'.")
+    if lowered not in context.variables:
+        raise SemanticError(f"Unknown variable '{name}' at line {line}, column {column} in target '{context.target.name}'.")
+
+
+def _ensure_list_exists(name: str, line: int, column: int, context: _AnalysisContext) -> None:
+    if name not in context.lists and name.lower() not in context.lists:
+        raise SemanticError(f"Unknown list '{name}' at line {line}, column {column} in target '{context.target.name}'.")
 
 
-def _ensure_list_exists(target: Target, name: str, lists: dict[str, int], line: int, column: int) -> None:
-    if name.lower() not in lists:
-        raise SemanticError(f"Unknown list '{name}' at line {line}, column {column} in target '{target.name}'.")
+# Statement analyzers keyed by exact node class.
+_STATEMENT_ANALYZERS: dict[type[Statement], Callable[[Any, _AnalysisContext], None]] = {
+    BroadcastStmt: _analyze_broadcast_stmt,
+    SetVarStmt: _analyze_set_var_stmt,
+    ChangeVarStmt: _analyze_change_var_stmt,
+    MoveStmt: _analyze_move_stmt,
+    SayStmt: _analyze_message_stmt,
+    ThinkStmt: _analyze_message_stmt,
+    WaitStmt: _analyze_wait_stmt,
+    TurnRightStmt: _analyze_turn_stmt,
+    TurnLeftStmt: _analyze_turn_stmt,
+    GoToXYStmt: _analyze_go_to_xy_stmt,
+    ChangeXByStmt: _analyze_value_stmt,
+    ChangeYByStmt: _analyze_value_stmt,
+    SetXStmt: _analyze_value_stmt,
+    SetYStmt: _analyze_value_stmt,
+    PointInDirectionStmt: _analyze_point_in_direction_stmt,
+    ChangeSizeByStmt: _analyze_value_stmt,
+    SetSizeToStmt: _analyze_value_stmt,
+    IfOnEdgeBounceStmt: _analyze_no_input_stmt,
+    ShowStmt: _analyze_no_input_stmt,
+    HideStmt: _analyze_no_input_stmt,
+    NextCostumeStmt: _analyze_no_input_stmt,
+    NextBackdropStmt: _analyze_no_input_stmt,
+    ResetTimerStmt: _analyze_no_input_stmt,
+    StopStmt: _analyze_stop_stmt,
+    AskStmt: _analyze_ask_stmt,
+    AddToListStmt: _analyze_add_to_list_stmt,
+    DeleteOfListStmt: _analyze_delete_of_list_stmt,
+    DeleteAllOfListStmt: _analyze_delete_all_of_list_stmt,
+    InsertAtListStmt: _analyze_insert_at_list_stmt,
+    ReplaceItemOfListStmt: _analyze_replace_item_of_list_stmt,
+    RepeatStmt: _analyze_repeat_stmt,
+    ForeverStmt: _analyze_no_input_stmt,
+    IfStmt: _analyze_if_stmt,
+    ProcedureCallStmt: _analyze_procedure_call_stmt,
+}